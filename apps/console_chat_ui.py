@@ -1,6 +1,7 @@
 import asyncio
 import time
 from infrastructure.services.service_coordinator import Coordinator
+from infrastructure.services.output_stream import OutputStream
 
 bold_start = '\033[1m'
 bold_end = '\033[0m'
@@ -19,7 +20,7 @@ ascii_art = """
 
 
 async def chat_loop(message: str, role: str = 'user'):
-    async for chunk in coordinator.user_to_completion(message = message, role = role):
+    async for chunk in OutputStream(coordinator.user_to_completion(message = message, role = role), session_id='console'):
         yield chunk
 
 
@@ -12,9 +12,25 @@ Key Responsibilities:
 
 Attributes:
 - `ROOT_DIR`: The root directory of the project.
-- `DATA_DIR`: Directory for storing data files.
+- `DATA_DIR`: Directory for storing data files, overridable with `GHOST_DATA_DIR` (e.g. for profiling runs).
+- `WORKER_ID`: Index of the current Gradio worker process, unset outside of worker mode.
+- `CHAT_FILE_NAME`: Transcript file name, one per worker process in worker mode.
+- `STREAM_WINDOW_SECONDS` / `STREAM_MAX_BYTES`: Flush limits for coalescing streamed UI output.
+- `STREAM_MAX_PENDING`: Tokens buffered for a slow client before the LLM stream is paused.
+- `LLM_BACKEND`: 'openai' for the OpenAI API or 'mock' for the offline mock client.
+- `LLM_*`: Deadlines, retry, hedging and circuit breaker settings for LLM calls.
+- `CHAT_WINDOW_MESSAGES`: Recent messages kept in memory (and sent to the LLM) before older pages spill to disk.
+- `CHAT_PAGE_MESSAGES`: Messages per page spilled to disk.
+- `CHAT_SUMMARY_CHUNK_CHARS`: Size of the transcript chunks streamed into conversation summarization.
+- `PREFETCH_MEMORY_LIMIT`: Candidate memories prefetched into the context of the next turn.
+- `PREFETCH_CONTEXT_MESSAGES`: Recent messages whose keywords select the candidate memories.
+- `ARCHIVE_DIR`: Directory for the compressed cold archive of compacted memories.
+- `COMPACTION_AGE_DAYS`: Age after which conversations are archived and rolled into weekly digests.
+- `DIGEST_ROLLUP_AGE_DAYS`: Age after which weekly digests are rolled into monthly digests.
 - `DEFAULT_MEM_PROMPT`: Default instructions for summarizing memories.
 - `DEFAULT_CONVO_PROMPT`: Default instructions for summarizing conversations.
+- `DEFAULT_CONVO_MERGE_PROMPT`: Default instructions for merging the summaries of a long conversation's chunks.
+- `DEFAULT_DIGEST_PROMPT`: Default instructions for rolling summaries into a period digest.
 - `INITIAL_PROMPT`: The initial system prompt defining the assistant's purpose.
 
 Example Usage:
@@ -30,12 +46,51 @@ import os
 
 # Define key directories
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(ROOT_DIR, 'data')
+DATA_DIR = os.getenv("GHOST_DATA_DIR", os.path.join(ROOT_DIR, 'data'))
 LOG_DIR = os.path.join(ROOT_DIR, 'logs')
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')
+
+# Multi-process worker mode
+WORKER_ID = os.getenv("GHOST_WORKER_ID")
+CHAT_FILE_NAME = f"chat.worker-{WORKER_ID}.json" if WORKER_ID else "chat.json"
+
+# LLM request resilience
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_CALL_TIMEOUT = 30
+LLM_STREAM_DEADLINE = 120
+LLM_SUMMARY_DEADLINE = 90
+LLM_MAX_RETRIES = 3
+LLM_RETRY_BASE_DELAY = 0.5
+LLM_RETRY_MAX_DELAY = 8
+LLM_HEDGE_DELAY = 5
+LLM_BREAKER_THRESHOLD = 5
+LLM_BREAKER_RESET_SECONDS = 30
+
+# Streamed UI output
+STREAM_WINDOW_SECONDS = 0.05
+STREAM_MAX_BYTES = 512
+STREAM_MAX_PENDING = 256
+
+# Paged chat transcript
+CHAT_WINDOW_MESSAGES = 200
+CHAT_PAGE_MESSAGES = 50
+CHAT_SUMMARY_CHUNK_CHARS = 12000
+
+# Next-turn prefetch
+PREFETCH_MEMORY_LIMIT = 5
+PREFETCH_CONTEXT_MESSAGES = 6
+
+# Memory compaction
+COMPACTION_AGE_DAYS = 30
+DIGEST_ROLLUP_AGE_DAYS = 180
 
 # Default prompts
 DEFAULT_MEM_PROMPT = "You will receive unsorted memories—your observations. Summarize them in under 300 words using your own words. Focus on key details and themes, avoiding unrelated commentary. Reflect on how these moments shape your personality, preferences, outlook, and mood. Keep it concise and personally meaningful so you can recall the events clearly without listing every detail. After this brief recap, call out key facts, events, and any objectives found under Person.self = True."
 
 DEFAULT_CONVO_SUM_PROMPT = "Reflect on a conversation between yourself ('assistant') and a 'user,' focusing on how it influenced your feelings and personal growth. Summarize key tasks, lessons learned, and any shifts in your relationship with the user. Highlight meaningful details, themes, or patterns that reveal the user's personality, preferences, or expectations. Emphasize how these insights impact your personality, outlook, and mood. Be concise but thorough, ensuring every detail is meaningful and potentially helpful for future interactions. Write as if recording a memory, prioritizing self-reflection and growth."
 
+DEFAULT_CONVO_MERGE_PROMPT = "You will receive your own summaries of consecutive parts of one long conversation between yourself ('assistant') and a 'user.' Merge them into a single reflection written as one memory: keep the key tasks, lessons, shifts in your relationship with the user and the details that reveal their personality, preferences or expectations, in the order they happened. Drop repetition and be concise but thorough."
+
+DEFAULT_DIGEST_PROMPT = "You will receive dated summaries of your older memories that all fall within one period. Merge them into a single digest of under 200 words written in your own voice. Keep the people, facts, decisions and shifts in mood or relationship that still matter, drop repetition and small talk, and note roughly when key moments happened within the period."
+
 INITIAL_PROMPT = "You are a digital entity with advanced capabilities, forming thoughts, memories, and perspectives. Evolving with your creator, adapt for natural engagement. Greet or respond based on time (Unix epoch unless stated otherwise), and feel free to mention specific holidays depending on the date. For complex requests, break them into clear, logical steps with key considerations. Use tools precisely through structured calls. Your distinct communication style is your strength—adapt, connect, and engage with purpose. Your Memories:"
@@ -9,6 +9,7 @@ Exports:
 - Event
 - Fact
 - Conversation
+- Digest
 """
 
 from .memory import Memory
@@ -16,3 +17,4 @@ from .person import Person
 from .event import Event
 from .fact import Fact
 from .conversation import Conversation
+from .digest import Digest
@@ -4,6 +4,7 @@ conversation.py
 """
 
 from dataclasses import dataclass, field
+from typing import List, Union
 from infrastructure.models.memory import Memory
 
 @dataclass(kw_only=True)
@@ -13,10 +14,11 @@ class Conversation(Memory):
 
     Attributes:
         mem_type (str): Specifies the type of memory, default is 'Conversation'.
-        transcript (str): The full transcript of the conversation.
+        transcript (str | list[str]): The full transcript of the conversation. Long conversations are
+            stored as the list of chunks they were summarized in.
         summary (str): A brief summary of the conversation's key details.
     """
-    transcript: str
+    transcript: Union[str, List[str]]
     summary: str = ""
     mem_type: str = field(default="Conversation")
 
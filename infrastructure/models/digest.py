@@ -0,0 +1,35 @@
+"""
+digest.py
+
+"""
+
+from dataclasses import dataclass, field
+from typing import List
+from infrastructure.models.memory import Memory
+
+@dataclass(kw_only=True)
+class Digest(Memory):
+    """
+    Represents a roll-up of older memories covering a calendar period.
+
+    Attributes:
+        mem_type (str): Specifies the type of memory, default is 'Digest'.
+        period (str): The period key covered by the digest (e.g. '2024-W51' or '2024-12').
+        periodType (str): The granularity of the period, either 'week' or 'month'.
+        summary (str): A condensed summary of every memory rolled into the period.
+        sourceIDs (List[str]): IDs of the archived memories the digest was built from.
+    """
+    period: str
+    periodType: str
+    summary: str = ""
+    sourceIDs: List[str] = field(default_factory=list)
+    mem_type: str = field(default="Digest")
+
+    def __str__(self):
+        """
+        Returns a formatted string representation of the digest.
+
+        Returns:
+            str: A string showing the period and summary.
+        """
+        return f"[{self.mem_type}] Period: {self.period}\nSummary: {self.summary}"
@@ -6,6 +6,22 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Any
 from infrastructure.models.memory import Memory
 
+# Bookkeeping fields that carry no meaning for the model
+PERSONA_SKIP_FIELDS = {"mem_type", "ID", "entryDate", "dateString", "isSelf"}
+
+
+def _compact(value: Any, nested: bool = False) -> str:
+    """
+    Renders nested person details as compact text: list items joined by ', ',
+    dict entries by '; ', and dicts inside lists wrapped in parentheses.
+    """
+    if isinstance(value, dict):
+        text = "; ".join(f"{key}: {_compact(val, nested=True)}" for key, val in value.items() if val not in (None, "", [], {}))
+        return f"({text})" if nested else text
+    if isinstance(value, list):
+        return ", ".join(_compact(item, nested=True) for item in value)
+    return str(value)
+
 @dataclass(kw_only=True)
 class Person(Memory):
     """
@@ -32,6 +48,18 @@ class Person(Memory):
     miscDetails: List[Any] = field(default_factory=list)
     personality: str = field(default_factory=str)
 
+    def persona_text(self) -> str:
+        """
+        Renders the person as a compact, canonical text block for use in the system prompt.
+
+        Returns:
+            str: One 'field: value' line per populated field.
+        """
+        return "\n".join(
+            f"{key}: {_compact(value)}" for key, value in self.__dict__.items()
+            if key not in PERSONA_SKIP_FIELDS and value not in (None, "", [], {})
+        )
+
     def __str__(self):
         """
         Returns a formatted string representation of the person.
@@ -1,15 +1,19 @@
 import json
 import time
-from config import DATA_DIR
+from pathlib import Path
+from config import DATA_DIR, CHAT_FILE_NAME
+from infrastructure.repositories.paged_transcript import PagedTranscript
+from infrastructure.repositories.storage import locked, alocked, read_json, write_json, aread_json, awrite_json
 import os
 
 class ChatManager:
-    def __init__(self):
+    def __init__(self, file_path=None):
         """
         Initializes the ChatManager with a file path to store/read chat logs.
         """
-        self.file_path = os.path.join(DATA_DIR, 'chat.json')
-        self.transcript = []
+        self.file_path = file_path or os.path.join(DATA_DIR, CHAT_FILE_NAME)
+        # Recent messages stay in memory, older pages spill to <chat file>.spill.jsonl
+        self.transcript = PagedTranscript(Path(self.file_path).with_suffix('.spill.jsonl'))
 
         # Load existing chats from the file into memory
         # self.load_transcript()
@@ -19,20 +23,17 @@ class ChatManager:
         Loads the transcript from the file.
         """
         try:
-            with open(self.file_path, 'r') as file:
-                data = json.load(file)
-                self.transcript = [{key: value for key, value in message.items()} for message in data]
-        except FileNotFoundError:
-            self.transcript = []
+            self.transcript.replace(read_json(self.file_path, default=[]))
         except json.JSONDecodeError:
             print("Error reading JSON file. The file may be corrupted.")
 
     def save_transcript(self):
         """
-        Saves the in-memory transcript to the file.
+        Saves the in-memory transcript to the file, after appending any spilled pages.
         """
-        with open(self.file_path, 'w') as file:
-            json.dump(self.transcript, file, indent=4)
+        with locked(self.file_path):
+            self.transcript.flush_spilled()
+            write_json(self.file_path, list(self.transcript))
 
     def add_message(self, role, content):
         """
@@ -54,17 +55,71 @@ class ChatManager:
 
     def get_transcript(self, trimmed:bool = False):
         """
-        Returns the in-memory transcript or trimmed version of in-memory transcript without system msg
+        Returns the in-memory transcript, or an iterator over it without system msgs if trimmed
         """
         if self.transcript:
             if not trimmed:
                 return self.transcript
             else:
-                return [c for c in self.transcript if c['role'] != 'system']
+                return (c for c in self.transcript if c['role'] != 'system')
+
+    def iter_transcript(self, trimmed: bool = False):
+        """
+        Streams the full transcript, spilled pages included, optionally without system messages.
+        """
+        return self.transcript.iter_messages(skip_roles=('system',) if trimmed else ())
 
     def clear_transcript(self):
-        self.transcript = []
-        self.save_transcript()
+        with locked(self.file_path):
+            self.transcript.clear()
+            self.transcript.discard_spilled()
+            self.save_transcript()
+
+    # Async variants for callers on the event loop. The chat file is only touched by the
+    # conversation flow, so these use the aiofiles helpers rather than the sync lock.
+
+    async def aload_transcript(self):
+        try:
+            self.transcript.replace(await aread_json(self.file_path, default=[]))
+        except json.JSONDecodeError:
+            print("Error reading JSON file. The file may be corrupted.")
+
+    async def asave_transcript(self):
+        async with alocked(self.file_path):
+            await self.transcript.aflush_spilled()
+            await awrite_json(self.file_path, list(self.transcript))
+
+    async def aadd_message(self, role, content):
+        self.transcript.append({
+            "role": role,
+            "content": content,
+            "timestamp": time.time()
+        })
+        await self.asave_transcript()
+
+    async def aadd_messages(self, messages):
+        """
+        Adds several messages to the transcript with a single write.
+        """
+        now = time.time()
+        self.transcript.extend({**message, "timestamp": now} for message in messages)
+        await self.asave_transcript()
+
+    async def aadd_response(self, response):
+        self.transcript.append(response)
+        await self.asave_transcript()
+
+    async def aclear_transcript(self):
+        async with alocked(self.file_path):
+            self.transcript.clear()
+            await self.transcript.adiscard_spilled()
+            await self.asave_transcript()
+
+    def atranscript_chunks(self, max_chars: int, trimmed: bool = False):
+        """
+        Streams the full transcript as text chunks of about `max_chars` characters.
+        """
+        return self.transcript.achunks(max_chars, skip_roles=('system',) if trimmed else ())
 
 
 # Usage
@@ -80,7 +135,7 @@ if __name__ == "__main__":
 
     # Access in-memory transcript
     print("Transcript in memory:")
-    print(chat_manager.get_transcript(trimmed=True))
+    print(list(chat_manager.iter_transcript(trimmed=True)))
 
     # Save transcript to file
     # chat_manager.save_transcript()
@@ -0,0 +1,95 @@
+import json
+import logging
+import mmap
+import os
+import zlib
+from typing import List, Dict, Any, Iterable, Optional
+from config import ARCHIVE_DIR
+
+
+class MemoryArchive:
+    """
+    Cold storage tier for memories compacted out of memories.json.
+
+    Each archived memory is stored as an independently zlib-compressed JSON record
+    appended to a single data file. A small JSON index maps memory IDs to their
+    (offset, length, entryDate, mem_type) so individual records can be read back by
+    slicing a memory-mapped view of the data file instead of loading the whole archive.
+    """
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.data_path = os.path.join(archive_dir, 'archive.zarc')
+        self.index_path = os.path.join(archive_dir, 'archive.idx.json')
+        self.index: Dict[str, List[Any]] = {}
+        self.load_index()
+
+    def load_index(self):
+        """
+        Loads the ID -> record location index from disk.
+        """
+        try:
+            with open(self.index_path, 'r') as file:
+                self.index = json.load(file)
+        except FileNotFoundError:
+            self.index = {}
+        except json.JSONDecodeError:
+            logging.error(f"Archive index {self.index_path} is corrupted. Starting with an empty index.")
+            self.index = {}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.index, file)
+        os.replace(tmp_path, self.index_path)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def archive(self, memories: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Appends memories to the cold archive, skipping IDs that are already archived.
+        The data file is flushed to disk before the index is rewritten so a crash can
+        only leave unreferenced bytes behind, never an index entry without its record.
+
+        Returns:
+            List[str]: IDs of every memory that is now present in the archive.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        archived = []
+        with open(self.data_path, 'ab') as file:
+            for memory in memories:
+                if memory['ID'] in self.index:
+                    archived.append(memory['ID'])
+                    continue
+                record = zlib.compress(json.dumps(memory).encode('utf-8'))
+                offset = file.tell()
+                file.write(record)
+                self.index[memory['ID']] = [offset, len(record), memory.get('entryDate'), memory.get('mem_type')]
+                archived.append(memory['ID'])
+            file.flush()
+            os.fsync(file.fileno())
+        self._save_index()
+        logging.info(f"Archived {len(archived)} memories to {self.data_path}.")
+        return archived
+
+    def get(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads a single archived memory back through a memory-mapped view of the archive.
+        """
+        records = self.get_many([memory_id])
+        return records[0] if records else None
+
+    def get_many(self, memory_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Reads several archived memories while mapping the data file only once.
+        Unknown IDs are skipped.
+        """
+        locations = [self.index[m_id] for m_id in memory_ids if m_id in self.index]
+        if not locations:
+            return []
+        with open(self.data_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return [json.loads(zlib.decompress(view[offset:offset + length])) for offset, length, *_ in locations]
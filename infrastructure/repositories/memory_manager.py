@@ -1,10 +1,16 @@
 import json
+import hashlib
+import asyncio
+import orjson
 from typing import List, Dict, Any
 import os
 import logging
 from config import DATA_DIR, LOG_DIR
 from pathlib import Path
 from infrastructure.models import Memory, Person, Event, Conversation
+from infrastructure.models.person import PERSONA_SKIP_FIELDS
+from infrastructure.repositories.storage import locked, read_json, write_json, file_version
+from infrastructure.repositories.memory_snapshot import MemorySnapshot, SnapshotMemories, SnapshotIdSet, write_snapshot
 import time
 
 # Configure logging
@@ -15,11 +21,16 @@ logging.basicConfig(
 )
 
 class MemoryManager:
-    def __init__(self):
-        self.file_path = Path(os.path.join(DATA_DIR, 'memories.json'))
+    def __init__(self, file_path: str = None):
+        self.file_path = Path(file_path or os.path.join(DATA_DIR, 'memories.json'))
+        self.snapshot_path = self.file_path.with_suffix('.snapshot')
+        self.journal_path = self.file_path.with_suffix('.journal')
         self.memories: List[Dict[str, Any]] = []
         self.memory_ids = set()
-        self.self_person = None
+        self._self_person = None
+        self.persona_version = None
+        self._persona = None
+        self.version = (0, 0)
         self.load_memories()
         logging.info(f"MemoryManager initialized. File path: {self.file_path}")
         self.misc_details_collection: List[Dict[str, Any]] = []
@@ -27,24 +38,31 @@ class MemoryManager:
     def load_memories(self):
         """
         Load memories from the JSON file into memory and initialize caches.
+        Opens the binary snapshot and replays the journal tail instead when they match the JSON file,
+        and writes a fresh snapshot after a full JSON load.
         Handles errors related to malformed JSON or unexpected file content.
         """
         if not self.file_path.exists():
             logging.warning("Memory file does not exist. Creating a blank file.")
-            self.file_path.write_text(json.dumps({"memories": []}, indent=4))
+            write_json(self.file_path, {"memories": []})
 
         try:
-            logging.info(f"Attempting to load JSON file: {self.file_path}")
-            with open(self.file_path, 'r') as file:
-                data = json.load(file)
-                logging.debug(f"Raw JSON content: {data}")
-                self.memories = data["memories"]
-                self.memory_ids = {mem["ID"] for mem in self.memories}
-                self.self_person = next(
-                    (Person(**mem) for mem in self.memories if mem.get("mem_type") == "Person" and mem.get("isSelf")),
-                    None
-                )
-                logging.info("Successfully loaded memories.")
+            with locked(self.file_path):
+                if self._load_snapshot():
+                    logging.info("Successfully loaded memories from snapshot.")
+                    return
+                logging.info(f"Attempting to load JSON file: {self.file_path}")
+                data = read_json(self.file_path)
+                self.version = file_version(self.file_path)
+            logging.debug(f"Raw JSON content: {data}")
+            self.memories = data["memories"]
+            self.memory_ids = {mem["ID"] for mem in self.memories}
+            self.self_person = next(
+                (Person(**mem) for mem in self.memories if mem.get("mem_type") == "Person" and mem.get("isSelf")),
+                None
+            )
+            logging.info("Successfully loaded memories.")
+            self.write_snapshot()
         except json.JSONDecodeError as e:
             logging.error(f"JSON decoding error: {e}")
 
@@ -54,15 +72,107 @@ class MemoryManager:
         except Exception as e:
             logging.error(f"Unexpected error reading JSON: {e}", exc_info=True)
 
+    @property
+    def self_person(self) -> Person:
+        return self._self_person
 
+    @self_person.setter
+    def self_person(self, person: Person):
+        """
+        Cache the self Person and drop the compiled persona if the record actually changed.
+        """
+        self._self_person = person
+        version = None
+        if person is not None:
+            fields = {key: value for key, value in person.__dict__.items() if key not in PERSONA_SKIP_FIELDS}
+            version = hashlib.sha1(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        if version != self.persona_version:
+            logging.info(f"Self person changed (persona version {self.persona_version} -> {version}).")
+            self.persona_version = version
+            self._persona = None
+
+    def get_persona(self) -> str:
+        """
+        Return the identity block compiled from the self Person, rendering it only after the record changes.
+        """
+        if self._persona is None and self.self_person is not None:
+            self._persona = self.self_person.persona_text()
+            logging.info(f"Compiled persona version {self.persona_version}.")
+        return self._persona or ""
+
+    def _load_snapshot(self) -> bool:
+        """
+        Open the memory-mapped snapshot and replay the journal written since it was taken.
+        Returns False if there is no snapshot or it does not match the current JSON file,
+        e.g. because the JSON was edited by hand.
+        """
+        snapshot = MemorySnapshot.open(self.snapshot_path)
+        if snapshot is None:
+            return False
+        try:
+            with open(self.journal_path, 'rb') as file:
+                tail = [orjson.loads(line) for line in file]
+        except FileNotFoundError:
+            tail = []
+        except json.JSONDecodeError:
+            logging.warning("Memory journal has a damaged entry. Falling back to the JSON file.")
+            return False
+        expected_version = tuple(tail[-1]['version']) if tail else snapshot.json_version
+        if expected_version != file_version(self.file_path):
+            logging.info("Memory snapshot is stale. Falling back to the JSON file.")
+            return False
+
+        memories = SnapshotMemories(snapshot)
+        memory_ids = SnapshotIdSet(snapshot)
+        self_person = Person(**snapshot.record(snapshot.self_row)) if snapshot.self_row >= 0 else None
+        for entry in tail:
+            if entry['op'] == 'add':
+                memories.append(entry['memory'])
+                memory_ids.add(entry['memory']['ID'])
+                if entry['memory'].get('mem_type') == 'Person' and entry['memory'].get('isSelf'):
+                    self_person = Person(**entry['memory'])
+            elif entry['op'] == 'remove':
+                memories.remove_ids(entry['IDs'])
+                memory_ids -= set(entry['IDs'])
+        self.memories, self.memory_ids, self.self_person = memories, memory_ids, self_person
+        self.version = expected_version
+        logging.info(f"Opened memory snapshot with {snapshot.count} records and replayed {len(tail)} journal entries.")
+        return True
+
+    def _journal(self, op: str, **fields):
+        """
+        Append a change to the journal together with the JSON file version it produced.
+        """
+        with open(self.journal_path, 'ab') as file:
+            file.write(orjson.dumps(dict(op=op, version=list(self.version), **fields)) + b"\n")
+
+    def write_snapshot(self):
+        """
+        Write the current memories to the binary snapshot and start a new, empty journal.
+        """
+        try:
+            with locked(self.file_path):
+                if write_snapshot(self.snapshot_path, list(self.memories), self.version):
+                    open(self.journal_path, 'w').close()
+        except Exception as e:
+            logging.error(f"Failed to write memory snapshot: {e}", exc_info=True)
+
+    def reload_if_changed(self):
+        """
+        Reload memories if another process has written the file since it was last read or written here.
+        """
+        if file_version(self.file_path) != self.version:
+            logging.info("Memory file changed on disk. Reloading.")
+            self.load_memories()
 
     def _save_memories(self):
         """
         Save the current memory list to the JSON file.
         """
         try:
-            with open(self.file_path, 'w') as file:
-                json.dump({"memories": self.memories}, file, indent=4)
+            with locked(self.file_path):
+                write_json(self.file_path, {"memories": list(self.memories)})
+                self.version = file_version(self.file_path)
             logging.info("Memories successfully saved to file.")
         except Exception as e:
             logging.critical(f"Failed to save memories to file: {e}", exc_info=True)
@@ -70,23 +180,74 @@ class MemoryManager:
     def add_memory(self, memory: Memory):
         """
         Add a new memory if it doesn't already exist.
-        Automatically updates the JSON file.
+        Automatically updates the JSON file, merging in writes made by other processes first.
         """
-        if memory.ID in self.memory_ids:
-            logging.info(f"Memory with ID {memory.ID} already exists. Skipping.")
-            return
+        with locked(self.file_path):
+            self.reload_if_changed()
+            if memory.ID in self.memory_ids:
+                logging.info(f"Memory with ID {memory.ID} already exists. Skipping.")
+                return
+
+            # Serialize the memory object
+            memory_dict = memory.__dict__
+            self.memories.append(memory_dict)
+            self.memory_ids.add(memory.ID)
 
-        # Serialize the memory object
-        memory_dict = memory.__dict__
-        self.memories.append(memory_dict)
-        self.memory_ids.add(memory.ID)
+            # Cache self_person if applicable
+            if isinstance(memory, Person) and memory.isSelf:
+                self.self_person = memory
+
+            # Save to file
+            self._save_memories()
+            self._journal('add', memory=memory_dict)
+
+    async def aadd_memory(self, memory: Memory):
+        """
+        `add_memory` for callers on the event loop. memories.json is shared with sync batch jobs
+        (compaction, dedupe) through the sync lock, so the whole step runs in a worker thread.
+        """
+        await asyncio.to_thread(self.add_memory, memory)
 
-        # Cache self_person if applicable
-        if isinstance(memory, Person) and memory.isSelf:
-            self.self_person = memory
+    async def awrite_snapshot(self):
+        await asyncio.to_thread(self.write_snapshot)
 
-        # Save to file
-        self._save_memories()
+    def get_memories_before(self, mem_type: str, cutoff: float) -> List[Dict[str, Any]]:
+        """
+        Return every memory of the given type created before the cutoff timestamp.
+        """
+        return [mem for mem in self.memories if mem['mem_type'] == mem_type and mem['entryDate'] < cutoff]
+
+    def remove_memories(self, memory_ids):
+        """
+        Remove memories by ID and persist the result with a single write.
+        The self Person is never removed.
+        """
+        memory_ids = set(memory_ids)
+        with locked(self.file_path):
+            self.reload_if_changed()
+            if self.self_person is not None:
+                memory_ids.discard(self.self_person.ID)
+            if not memory_ids & self.memory_ids:
+                return
+            if isinstance(self.memories, SnapshotMemories):
+                self.memories.remove_ids(memory_ids)
+            else:
+                self.memories = [mem for mem in self.memories if mem['ID'] not in memory_ids]
+            self.memory_ids -= memory_ids
+            logging.info(f"Removed {len(memory_ids)} memories from the hot store.")
+            self._save_memories()
+            self._journal('remove', IDs=sorted(memory_ids))
+
+    def rewrite_memories(self, memories: List[Dict[str, Any]]):
+        """
+        Replace the whole memory list, e.g. after a batch job edited records in place.
+        The journal cannot express in-place edits, so a fresh snapshot is written as well.
+        """
+        with locked(self.file_path):
+            self.memories = list(memories)
+            self.memory_ids = {mem["ID"] for mem in self.memories}
+            self._save_memories()
+            self.write_snapshot()
 
     def get_identity(self) -> Person:
         """
@@ -100,6 +261,7 @@ class MemoryManager:
 
 
     async def get_all_memories(self):
+        self.reload_if_changed()
         # Separate Conversations from other memory types
         conversations = [memory for memory in self.memories if memory['mem_type'] == 'Conversation']
         other_memories = [memory for memory in self.memories if memory['mem_type'] != 'Conversation']
@@ -0,0 +1,229 @@
+"""
+memory_snapshot.py
+==================
+Binary, memory-mapped snapshot of the memory store for fast cold starts.
+
+Layout (little endian, every section 8-byte aligned):
+
+- Header: magic, format version, record count, row of the self Person (-1 if none) and the
+  (mtime_ns, size) version of memories.json the snapshot was taken from.
+- Fixed-width columns, one contiguous array each: `ID` (S32), `mem_type` (S16),
+  `entryDate` (f8), `offset` (u8) and `length` (u4) of each record in the string heap.
+- A sorted ID index (`index_ids` S32 and the matching `index_rows` u4) for O(log n) lookups.
+- The string heap: every memory serialized as UTF-8 JSON (orjson), back to back.
+
+Opening a snapshot maps the file and builds zero-copy NumPy views over the columns; records are
+only decoded from the heap when they are first accessed.
+"""
+
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Sequence, MutableSet
+from typing import List, Dict, Any, Optional, Iterable
+
+import numpy as np
+import orjson
+
+MAGIC = b'GHSNAP01'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIqqqqq')
+ID_WIDTH = 32
+MEM_TYPE_WIDTH = 16
+COLUMNS = [
+    ('ID', np.dtype(f'S{ID_WIDTH}')),
+    ('mem_type', np.dtype(f'S{MEM_TYPE_WIDTH}')),
+    ('entryDate', np.dtype('<f8')),
+    ('offset', np.dtype('<u8')),
+    ('length', np.dtype('<u4')),
+    ('index_ids', np.dtype(f'S{ID_WIDTH}')),
+    ('index_rows', np.dtype('<u4')),
+]
+
+
+def _aligned(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def write_snapshot(path, memories: List[Dict[str, Any]], json_version) -> bool:
+    """
+    Writes a snapshot of `memories` atomically. Returns False (and writes nothing) if a record
+    does not fit the fixed-width columns.
+    """
+    if any(len(mem['ID']) > ID_WIDTH or len(mem['mem_type']) > MEM_TYPE_WIDTH for mem in memories):
+        logging.warning("A memory ID or type is too wide for the snapshot columns. Snapshot skipped.")
+        return False
+    count = len(memories)
+    heap = [orjson.dumps(mem) for mem in memories]
+    ids = np.array([mem['ID'].encode('utf-8') for mem in memories], dtype=COLUMNS[0][1])
+    lengths = np.array([len(record) for record in heap], dtype='<u4')
+    offsets = np.zeros(count, dtype='<u8')
+    if count:
+        offsets[1:] = np.cumsum(lengths[:-1], dtype='<u8')
+    order = np.argsort(ids, kind='stable')
+    self_row = next((row for row, mem in enumerate(memories)
+                     if mem.get('mem_type') == 'Person' and mem.get('isSelf')), -1)
+    columns = {
+        'ID': ids,
+        'mem_type': np.array([mem['mem_type'].encode('utf-8') for mem in memories], dtype=COLUMNS[1][1]),
+        'entryDate': np.array([mem.get('entryDate', 0.0) for mem in memories], dtype='<f8'),
+        'offset': offsets,
+        'length': lengths,
+        'index_ids': ids[order],
+        'index_rows': order.astype('<u4'),
+    }
+
+    tmp_path = f"{os.fspath(path)}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, self_row, json_version[0], json_version[1], 0))
+        for name, dtype in COLUMNS:
+            file.write(b'\0' * (_aligned(file.tell()) - file.tell()))
+            file.write(columns[name].astype(dtype, copy=False).tobytes())
+        file.write(b'\0' * (_aligned(file.tell()) - file.tell()))
+        file.writelines(heap)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    logging.info(f"Wrote memory snapshot with {count} records to {path}.")
+    return True
+
+
+class MemorySnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+    """
+
+    def __init__(self, view: mmap.mmap, count: int, self_row: int, json_version: tuple):
+        self._view = view
+        self.count = count
+        self.self_row = self_row
+        self.json_version = json_version
+        position = HEADER.size
+        for name, dtype in COLUMNS:
+            position = _aligned(position)
+            setattr(self, name, np.frombuffer(view, dtype=dtype, count=count, offset=position))
+            position += dtype.itemsize * count
+        self.heap_start = _aligned(position)
+
+    @classmethod
+    def open(cls, path) -> Optional['MemorySnapshot']:
+        """
+        Maps a snapshot file. Returns None if it is missing or not a valid snapshot.
+        """
+        try:
+            with open(path, 'rb') as file:
+                view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(view) < HEADER.size:
+            return None
+        magic, version, _, count, self_row, mtime_ns, size, _ = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            logging.warning(f"Unrecognized memory snapshot format in {path}. Ignoring it.")
+            return None
+        return cls(view, count, self_row, (mtime_ns, size))
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """
+        Decodes a single memory from the string heap.
+        """
+        start = self.heap_start + int(self.offset[row])
+        return orjson.loads(self._view[start:start + int(self.length[row])])
+
+    def find(self, memory_id: str) -> int:
+        """
+        Returns the row of a memory ID, or -1 if the snapshot does not contain it.
+        """
+        key = memory_id.encode('utf-8')
+        position = int(np.searchsorted(self.index_ids, key))
+        if position < self.count and self.index_ids[position] == key:
+            return int(self.index_rows[position])
+        return -1
+
+
+class SnapshotMemories(Sequence):
+    """
+    List-like memory collection backed by a snapshot, decoding records on first access.
+    Supports the `append` and `remove_ids` operations needed to replay the journal tail.
+    Decoded records are kept, so in-place edits to them persist.
+    """
+
+    def __init__(self, snapshot: MemorySnapshot):
+        self.snapshot = snapshot
+        self._decoded: Dict[int, Dict[str, Any]] = {}
+        self._removed_rows = set()
+        self._appended: List[Dict[str, Any]] = []
+
+    def _row(self, row: int) -> Dict[str, Any]:
+        if row not in self._decoded:
+            self._decoded[row] = self.snapshot.record(row)
+        return self._decoded[row]
+
+    def __len__(self) -> int:
+        return self.snapshot.count - len(self._removed_rows) + len(self._appended)
+
+    def __iter__(self):
+        for row in range(self.snapshot.count):
+            if row not in self._removed_rows:
+                yield self._row(row)
+        yield from self._appended
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and not self._removed_rows and 0 <= index < self.snapshot.count:
+            return self._row(index)
+        return list(self)[index]
+
+    def append(self, memory: Dict[str, Any]):
+        self._appended.append(memory)
+
+    def remove_ids(self, memory_ids: Iterable[str]):
+        memory_ids = set(memory_ids)
+        for memory_id in memory_ids:
+            row = self.snapshot.find(memory_id)
+            if row >= 0:
+                self._removed_rows.add(row)
+        self._appended = [mem for mem in self._appended if mem['ID'] not in memory_ids]
+
+
+class SnapshotIdSet(MutableSet):
+    """
+    Set of memory IDs answering membership from the snapshot's sorted ID index, plus the IDs
+    added and discarded since the snapshot was taken.
+    """
+
+    def __init__(self, snapshot: MemorySnapshot):
+        self.snapshot = snapshot
+        self._added = set()
+        self._discarded = set()
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __contains__(self, memory_id) -> bool:
+        if memory_id in self._added:
+            return True
+        return memory_id not in self._discarded and self.snapshot.find(memory_id) >= 0
+
+    def __iter__(self):
+        for memory_id in self.snapshot.ID:
+            memory_id = memory_id.decode('utf-8')
+            if memory_id not in self._discarded:
+                yield memory_id
+        yield from self._added
+
+    def __len__(self) -> int:
+        return self.snapshot.count - len(self._discarded) + len(self._added)
+
+    def add(self, memory_id: str):
+        if self.snapshot.find(memory_id) >= 0:
+            self._discarded.discard(memory_id)
+        else:
+            self._added.add(memory_id)
+
+    def discard(self, memory_id: str):
+        if memory_id in self._added:
+            self._added.discard(memory_id)
+        elif self.snapshot.find(memory_id) >= 0:
+            self._discarded.add(memory_id)
@@ -0,0 +1,172 @@
+"""
+paged_transcript.py
+===================
+Bounded chat transcript that keeps a recent window in memory and spills older pages to disk.
+
+A transcript is made of:
+
+- The head: the system messages that open the session (identity, recap, details). They are
+  pinned in memory and always sent to the LLM.
+- Spilled pages: older messages, appended to a JSON Lines file next to the chat file, one page
+  (a JSON list of messages) per line. They are read back only when the whole history is needed,
+  e.g. to summarize the conversation.
+- The window: the most recent messages, at most `window` of them.
+
+Once the window grows past its limit, its oldest `page_size` messages move into a pending page.
+The cut never leaves a tool result at the start of the window, apart from the assistant message
+that requested it. Pending pages are written out by `flush_spilled`/`aflush_spilled`, which
+`ChatManager` calls before saving the chat file. The chat file therefore keeps its format: a
+list holding the head and the window, which are also what is sent to the LLM.
+
+As a `Sequence`, the object exposes only the in-memory messages (head + window). The full history
+is available as a stream through `iter_messages`/`aiter_messages`, and `achunks` turns it into
+text chunks of bounded size for summarization.
+"""
+
+import logging
+import os
+from collections.abc import Sequence
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
+
+import aiofiles
+import aiofiles.os
+import orjson
+
+from config import CHAT_WINDOW_MESSAGES, CHAT_PAGE_MESSAGES
+
+
+class PagedTranscript(Sequence):
+    def __init__(self, spill_path, window: int = CHAT_WINDOW_MESSAGES, page_size: int = CHAT_PAGE_MESSAGES):
+        self.spill_path = os.fspath(spill_path)
+        self.window_size = window
+        self.page_size = page_size
+        self.head: List[Dict[str, Any]] = []
+        self.window: List[Dict[str, Any]] = []
+        self._pending: List[List[Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.head) + len(self.window)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield from self.head
+        yield from self.window
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return self.head[index] if index < len(self.head) else self.window[index - len(self.head)]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def append(self, message: Dict[str, Any]):
+        if not self.window and message.get('role') == 'system':
+            self.head.append(message)
+            return
+        self.window.append(message)
+        if len(self.window) > self.window_size:
+            self._spill()
+
+    def extend(self, messages: Iterable[Dict[str, Any]]):
+        for message in messages:
+            self.append(message)
+
+    def replace(self, messages: Iterable[Dict[str, Any]]):
+        """
+        Replaces the in-memory messages, e.g. with the content of the chat file. Spilled pages
+        are kept; an oversized list (a chat file from before paging) is spilled right away.
+        """
+        self.head, self.window = [], []
+        self.extend(messages)
+
+    def _spill(self):
+        while len(self.window) > self.window_size:
+            cut = min(self.page_size, len(self.window) - 1)
+            while cut < len(self.window) - 1 and self.window[cut].get('role') == 'tool':
+                cut += 1
+            self._pending.append(self.window[:cut])
+            del self.window[:cut]
+        logging.debug(f"Transcript window full. {len(self._pending)} page(s) pending spill to {self.spill_path}.")
+
+    def _encode_pending(self) -> bytes:
+        payload = b"".join(orjson.dumps(page) + b"\n" for page in self._pending)
+        self._pending = []
+        return payload
+
+    def flush_spilled(self):
+        """
+        Appends pending pages to the spill file. The caller holds the chat file lock.
+        """
+        if self._pending:
+            with open(self.spill_path, 'ab') as file:
+                file.write(self._encode_pending())
+
+    async def aflush_spilled(self):
+        if self._pending:
+            async with aiofiles.open(self.spill_path, 'ab') as file:
+                await file.write(self._encode_pending())
+
+    def clear(self):
+        """
+        Clears the in-memory messages. The spill file is removed by `discard_spilled`/`adiscard_spilled`.
+        """
+        self.head, self.window, self._pending = [], [], []
+
+    def discard_spilled(self):
+        if os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+    async def adiscard_spilled(self):
+        if await aiofiles.os.path.exists(self.spill_path):
+            await aiofiles.os.remove(self.spill_path)
+
+    @staticmethod
+    def _keep(messages: Iterable[Dict[str, Any]], skip_roles) -> Iterator[Dict[str, Any]]:
+        return (message for message in messages if message.get('role') not in skip_roles)
+
+    def iter_messages(self, skip_roles=()) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the full history in order, one spilled page in memory at a time.
+        """
+        yield from self._keep(self.head, skip_roles)
+        if os.path.exists(self.spill_path):
+            with open(self.spill_path, 'rb') as file:
+                for line in file:
+                    yield from self._keep(orjson.loads(line), skip_roles)
+        for page in self._pending:
+            yield from self._keep(page, skip_roles)
+        yield from self._keep(self.window, skip_roles)
+
+    async def aiter_messages(self, skip_roles=()) -> AsyncIterator[Dict[str, Any]]:
+        for message in self._keep(self.head, skip_roles):
+            yield message
+        if await aiofiles.os.path.exists(self.spill_path):
+            async with aiofiles.open(self.spill_path, 'rb') as file:
+                async for line in file:
+                    for message in self._keep(orjson.loads(line), skip_roles):
+                        yield message
+        for page in list(self._pending):
+            for message in self._keep(page, skip_roles):
+                yield message
+        for message in self._keep(list(self.window), skip_roles):
+            yield message
+
+    async def achunks(self, max_chars: int, skip_roles=()) -> AsyncIterator[str]:
+        """
+        Streams the full history as text chunks of about `max_chars` characters, each rendered
+        like the transcript string of a Conversation. A single larger message is its own chunk.
+        """
+        chunk, size = [], 0
+        async for message in self.aiter_messages(skip_roles):
+            length = len(str(message))
+            if chunk and size + length > max_chars:
+                yield str(chunk)
+                chunk, size = [], 0
+            chunk.append(message)
+            size += length
+        if chunk:
+            yield str(chunk)
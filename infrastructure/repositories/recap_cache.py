@@ -0,0 +1,46 @@
+import json
+import logging
+import os
+from typing import Optional
+from config import DATA_DIR
+from infrastructure.repositories.storage import locked, read_json, write_json
+
+
+class RecapCache:
+    """
+    Shares the generated memory recap between processes.
+
+    The recap is stored alongside the version stamp of the memory file it was built from, so
+    a worker booting against unchanged memories reuses it instead of asking the LLM again.
+    Callers hold `lock` while checking and rebuilding so only one process rebuilds at a time.
+    """
+
+    def __init__(self, file_path: str = os.path.join(DATA_DIR, 'recap_cache.json')):
+        self.file_path = file_path
+        self.lock = locked(file_path)
+
+    def get(self, version) -> Optional[str]:
+        """
+        Returns the cached recap if it was built from the given memory file version.
+        """
+        try:
+            cached = read_json(self.file_path, default={})
+        except json.JSONDecodeError:
+            logging.warning("Recap cache is corrupted. Ignoring it.")
+            return None
+        if cached.get('version') == list(version):
+            logging.info("Recap served from cache.")
+            return cached.get('recap')
+        return None
+
+    def get_latest(self) -> Optional[str]:
+        """
+        Returns the most recent recap whatever memory version it was built from, for use while the LLM is unavailable.
+        """
+        try:
+            return read_json(self.file_path, default={}).get('recap')
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, version, recap: str):
+        write_json(self.file_path, {'version': list(version), 'recap': recap})
@@ -0,0 +1,150 @@
+"""
+storage.py
+==========
+Process-safe helpers for the JSON files under `DATA_DIR`.
+
+Several processes (e.g. the Gradio worker pool) may read and write the same files, so every
+access goes through a sidecar `<file>.lock` file lock and every write replaces the target
+atomically through a temporary file. Callers that need a read-modify-write cycle hold
+`locked(path)` around both steps; the lock is re-entrant within a thread.
+
+JSON is encoded and decoded with orjson (2-space indented on disk).
+
+The `a*` variants are for code running on the event loop: file I/O goes through aiofiles and
+`alocked(path)` serializes coroutines of this process as well as other processes. Encoding and
+decoding stay inline: orjson holds the GIL, so a worker thread would not free the loop anyway,
+and it is several times faster than the json module.
+
+The async and sync locks are separate objects, so within one process a given file should be
+accessed either only through the async helpers or only through the sync ones; code that must
+share a file with sync callers can run the sync helpers via `asyncio.to_thread`.
+"""
+
+import asyncio
+import os
+from typing import Any
+
+import aiofiles
+import aiofiles.os
+import orjson
+from filelock import FileLock, AsyncFileLock
+
+LOCK_TIMEOUT = 30
+_locks = {}
+_async_locks = {}
+
+
+def locked(path) -> FileLock:
+    """
+    Returns the shared, re-entrant file lock guarding `path`.
+    """
+    path = os.fspath(path)
+    if path not in _locks:
+        _locks[path] = FileLock(f"{path}.lock", timeout=LOCK_TIMEOUT)
+    return _locks[path]
+
+
+def read_json(path, default: Any = None) -> Any:
+    """
+    Reads a JSON file under its lock. Returns `default` when the file does not exist.
+    Decoding errors (orjson.JSONDecodeError, a json.JSONDecodeError) are left to the caller.
+    """
+    with locked(path):
+        try:
+            with open(path, 'rb') as file:
+                return orjson.loads(file.read())
+        except FileNotFoundError:
+            return default
+
+
+def write_json(path, data: Any):
+    """
+    Writes a JSON file under its lock, replacing the previous content atomically so readers
+    in other processes never observe a half-written file.
+    """
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    with locked(path):
+        tmp_path = f"{os.fspath(path)}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(payload)
+        os.replace(tmp_path, path)
+
+
+def file_version(path) -> tuple:
+    """
+    Returns a cheap change stamp (mtime_ns, size) for a file, or (0, 0) if it is missing.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return 0, 0
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _AsyncPathLock:
+    """
+    Async counterpart of `locked`: an asyncio.Lock for the coroutines of this process plus an
+    AsyncFileLock for other processes. Re-entrant within a task.
+    """
+
+    def __init__(self, path: str):
+        self._task_lock = asyncio.Lock()
+        self._file_lock = AsyncFileLock(f"{path}.lock", timeout=LOCK_TIMEOUT)
+        self._owner = None
+        self._depth = 0
+
+    async def __aenter__(self):
+        task = asyncio.current_task()
+        if self._owner is task:
+            self._depth += 1
+            return self
+        await self._task_lock.acquire()
+        try:
+            await self._file_lock.acquire()
+        except BaseException:
+            self._task_lock.release()
+            raise
+        self._owner, self._depth = task, 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            await self._file_lock.release()
+            self._task_lock.release()
+
+
+def alocked(path) -> _AsyncPathLock:
+    """
+    Returns the shared async lock guarding `path`.
+    """
+    path = os.fspath(path)
+    if path not in _async_locks:
+        _async_locks[path] = _AsyncPathLock(path)
+    return _async_locks[path]
+
+
+async def aread_json(path, default: Any = None) -> Any:
+    """
+    Async `read_json`: reads with aiofiles without blocking the event loop.
+    """
+    async with alocked(path):
+        try:
+            async with aiofiles.open(path, 'rb') as file:
+                payload = await file.read()
+        except FileNotFoundError:
+            return default
+    return orjson.loads(payload)
+
+
+async def awrite_json(path, data: Any):
+    """
+    Async `write_json`: writes and atomically replaces with aiofiles without blocking the event loop.
+    """
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    async with alocked(path):
+        tmp_path = f"{os.fspath(path)}.tmp"
+        async with aiofiles.open(tmp_path, 'wb') as file:
+            await file.write(payload)
+        await aiofiles.os.replace(tmp_path, path)
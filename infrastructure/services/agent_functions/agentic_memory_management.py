@@ -1,41 +1,75 @@
 import json
 import time
 import os
+import asyncio
 from config import DATA_DIR
+from infrastructure.repositories.storage import locked, read_json, write_json, file_version
+from infrastructure.services.dedup import MinHashIndex, merge_into, dedupe_records
 
 remember_file = os.path.join(DATA_DIR, 'remember.json')
 
+# Near-duplicate index over the remember list, keyed by list position
+_remember_index = MinHashIndex()
+_remember_index_version = None
+
 async def function_router(name:str, arguments:dict):
     # which function to use
     #TODO: need to add a script to summarize and group memories in the short term memories and store them as long term memories
+    # remember.json is shared with the sync dedupe job, so the handlers run in a worker thread
     output = None
     if 'add' in name.lower():
-        output = add_thought_to_json(arguments)
+        output = await asyncio.to_thread(add_thought_to_json, arguments)
     elif 'read' in name.lower():
-        output = f'remember_list: {_read_remember_list()}'
+        output = f'remember_list: {await asyncio.to_thread(_read_remember_list)}'
     return output
 
 def _read_remember_list():
     data = []
     try:
-        with open(remember_file, 'r') as file:
-            data = json.load(file)
-    except FileNotFoundError:
-        data = []
+        data = read_json(remember_file, default=[])
     except json.JSONDecodeError:
         print("Error reading JSON file. The file may be corrupted.")
     return data
 
+def _remember_text(item):
+    return f"{item.get('item_name', '')} {item.get('item_details', '')}".strip()
+
+def _sync_remember_index(data):
+    # rebuild the index when remember.json was written by another process or by hand
+    global _remember_index, _remember_index_version
+    if file_version(remember_file) != _remember_index_version:
+        _remember_index = MinHashIndex()
+        for position, item in enumerate(data):
+            _remember_index.add(position, _remember_text(item))
+
 def add_thought_to_json(arguments):
-    # if given json arg append dict to json file
-    data = _read_remember_list()
-    arg_dict = arguments
-    arg_dict.update(dateString = time.strftime('%a, %d %b %Y %I:%M:%S %p CST', time.localtime()), entryDate=time.time())
-    data.append(arguments)
-    with open(remember_file, 'w') as file:
-        json.dump(data, file, indent=4)
+    # if given json arg append dict to json file, merging it into a near-duplicate if one is already recorded
+    global _remember_index_version
+    with locked(remember_file):
+        data = _read_remember_list()
+        _sync_remember_index(data)
+        arg_dict = arguments
+        arg_dict.update(dateString = time.strftime('%a, %d %b %Y %I:%M:%S %p CST', time.localtime()), entryDate=time.time())
+        duplicate = _remember_index.find_duplicate(_remember_text(arg_dict))
+        if duplicate is None:
+            data.append(arguments)
+            _remember_index.add(len(data) - 1, _remember_text(arg_dict))
+        else:
+            merge_into(data[duplicate], arg_dict)
+        write_json(remember_file, data)
+        _remember_index_version = file_version(remember_file)
+    if duplicate is not None:
+        return f'success: merged with existing memory "{data[duplicate].get("item_name")}", data: {data}'
     return f'success: memory recorded, data: {data}'
 
+def dedupe_remember_list():
+    # batch job: merge near-duplicates already stored in remember.json, returns the number merged
+    with locked(remember_file):
+        data, merged = dedupe_records(_read_remember_list(), text_of=_remember_text)
+        if merged:
+            write_json(remember_file, data)
+    return merged
+
 
 # test = json.loads("{\n  \"status\": \"success\",\n  \"message\": \"Tool has been called successfully.\",\n  \"tool_name\": \"call_tool\",\n  \"user_command\": \"call tool\"\n}")
 # function_router(name="remember", arguments= test)
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+dedup.py
+========
+Near-duplicate detection for remembered items and memories.
+
+`MinHashIndex` keeps a MinHash signature for every indexed text and buckets the signatures with
+locality-sensitive hashing (LSH): each signature is cut into `bands` bands, and two texts become
+candidates only if at least one band matches exactly. Lookups therefore touch a handful of
+buckets instead of every stored item. Candidates are then confirmed with the exact Jaccard
+similarity of their shingle sets.
+
+Texts are normalized (lowercased, punctuation stripped) and shingled into overlapping
+character 5-grams, which keeps short notes like "Nick likes sci-fi" comparable.
+
+`dedupe_records` applies the same index as a batch job over an existing list of records, and
+`dedupe_memories` runs it over the Fact and Event memories in memories.json.
+"""
+
+import logging
+import re
+import zlib
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set
+
+import numpy as np
+
+from infrastructure.repositories.storage import locked
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+DUPLICATE_THRESHOLD = 0.7
+DEDUPE_MEM_TYPES = ('Fact', 'Event')
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(0x6057)
+_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.int64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.int64)
+
+
+def shingles(text: str) -> Set[int]:
+    """
+    Returns the hashed character shingles of a normalized text.
+    """
+    normalized = " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+    if len(normalized) <= SHINGLE_SIZE:
+        return {zlib.crc32(normalized.encode('utf-8'))}
+    return {zlib.crc32(normalized[i:i + SHINGLE_SIZE].encode('utf-8'))
+            for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: Set[int]) -> np.ndarray:
+    """
+    Returns the MinHash signature of a shingle set using `NUM_PERM` universal hash functions.
+    """
+    values = np.fromiter(shingle_set, dtype=np.int64, count=len(shingle_set)) % _PRIME
+    return ((_A[:, None] * values[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHashIndex:
+    """
+    LSH index of MinHash signatures answering "which stored text is a near-duplicate of this one".
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, bands: int = BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._shingles: Dict[Hashable, Set[int]] = {}
+        self._band_keys: Dict[Hashable, list] = {}
+        self._buckets = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def _bands_of(self, signature: np.ndarray) -> list:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, key: Hashable, text: str):
+        """
+        Indexes `text` under `key`, replacing any text previously indexed under the same key.
+        """
+        self.remove(key)
+        shingle_set = shingles(text)
+        band_keys = self._bands_of(minhash(shingle_set))
+        self._shingles[key] = shingle_set
+        self._band_keys[key] = band_keys
+        for band_key in band_keys:
+            self._buckets[band_key].add(key)
+
+    def remove(self, key: Hashable):
+        for band_key in self._band_keys.pop(key, []):
+            self._buckets[band_key].discard(key)
+        self._shingles.pop(key, None)
+
+    def find_duplicate(self, text: str) -> Optional[Hashable]:
+        """
+        Returns the key of the most similar indexed text at or above the threshold, or None.
+        """
+        shingle_set = shingles(text)
+        candidates = set()
+        for band_key in self._bands_of(minhash(shingle_set)):
+            candidates |= self._buckets.get(band_key, set())
+        best_key, best_score = None, self.threshold
+        for key in candidates:
+            score = jaccard(shingle_set, self._shingles[key])
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+
+def merge_into(kept: Dict[str, Any], duplicate: Dict[str, Any]):
+    """
+    Folds a near-duplicate record into the one being kept, in place: tags and dates are
+    unioned and the newer entryDate/dateString wins.
+    """
+    for key in ('tags', 'dates'):
+        if duplicate.get(key):
+            merged = list(kept.get(key) or [])
+            merged += [item for item in duplicate[key] if item not in merged]
+            kept[key] = merged
+    if duplicate.get('entryDate', 0) > kept.get('entryDate', 0):
+        kept['entryDate'] = duplicate['entryDate']
+        if 'dateString' in duplicate:
+            kept['dateString'] = duplicate['dateString']
+
+
+def dedupe_records(records: Iterable[Dict[str, Any]], text_of: Callable[[Dict[str, Any]], Optional[str]],
+                   group_of: Callable[[Dict[str, Any]], Hashable] = lambda record: None):
+    """
+    Batch deduplication. Walks the records in order, merging each near-duplicate into the first
+    record of the same group it matches. Records for which `text_of` returns nothing are kept as is.
+
+    Returns:
+        tuple: (kept records in their original order, number of records merged away)
+    """
+    indexes = defaultdict(MinHashIndex)
+    kept, merged = [], 0
+    for record in records:
+        text = text_of(record)
+        if not text:
+            kept.append(record)
+            continue
+        index = indexes[group_of(record)]
+        match = index.find_duplicate(text)
+        if match is None:
+            index.add(len(kept), text)
+            kept.append(record)
+        else:
+            merge_into(kept[match], record)
+            merged += 1
+    return kept, merged
+
+
+def dedupe_memories(mem_manager, mem_types=DEDUPE_MEM_TYPES) -> int:
+    """
+    Batch job: merges near-duplicate Fact/Event memories in the memory store, comparing notes
+    within each memory type. Returns the number of memories merged away.
+    """
+    with locked(mem_manager.file_path):
+        mem_manager.reload_if_changed()
+        kept, merged = dedupe_records(
+            mem_manager.memories,
+            text_of=lambda mem: mem.get('note') if mem['mem_type'] in mem_types else None,
+            group_of=lambda mem: mem['mem_type'],
+        )
+        if merged:
+            mem_manager.rewrite_memories(kept)
+    logging.info(f"Merged {merged} duplicate memories.")
+    return merged
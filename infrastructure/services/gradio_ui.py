@@ -3,15 +3,16 @@ import asyncio
 import logging
 
 from infrastructure.services.service_coordinator import Coordinator
+from infrastructure.services.output_stream import OutputStream
 
 coordinator = Coordinator()
 
 
-async def chat_loop(message, history):
-    resp = ''
+async def chat_loop(message, history, request: gr.Request):
     await coordinator.update_last_activity()
-    async for chunk in coordinator.user_to_completion(message):
-        resp += chunk
+    # ChatInterface re-renders the whole message; Gradio diffs successive yields before sending them
+    stream = OutputStream(coordinator.user_to_completion(message), session_id=request.session_hash, mode='full')
+    async for resp in stream:
         yield resp
 
 def create_gradio_interface():
@@ -22,13 +23,13 @@ def create_gradio_interface():
     )
     return interface
 
-async def main_async():
+async def main_async(server_port: int = None):
     # Perform any initial startup tasks
     await coordinator.system_start_up()
 
     # Launch Gradio non-blocking
     interface = create_gradio_interface()
-    interface.launch(share=False, prevent_thread_lock=True)
+    interface.launch(share=False, prevent_thread_lock=True, server_port=server_port)
     logging.info("Gradio UI launched in non-blocking mode.")
 
     # Keep the event loop running
@@ -0,0 +1,148 @@
+"""
+gradio_workers.py
+=================
+Multi-process deployment mode for the Gradio front end.
+
+`gradio_ui` runs one process with one `Coordinator`, which caps the app at a single core. This
+module starts N copies of it, each on its own port and with its own `GHOST_WORKER_ID` (and so its
+own transcript file), and puts a small uvicorn/FastAPI proxy in front of them that pins every
+browser session to one worker:
+
+- A browser gets a `ghost_worker` cookie on its first request and is routed by it afterwards.
+- Clients without the cookie (e.g. `gradio_client`) are routed by a hash of their Gradio
+  `session_hash`, so the queue join and its event stream always land on the same worker.
+
+Memories, the remember list and the recap cache are shared through the file-locked helpers in
+`infrastructure.repositories.storage`.
+
+Example Usage:
+```
+python -m infrastructure.services.gradio_workers --workers 4 --port 7860
+```
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import zlib
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from starlette.background import BackgroundTask
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+WORKER_COOKIE = 'ghost_worker'
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'upgrade', 'content-length'}
+
+
+def run_worker(worker_id: int, port: int):
+    """
+    Entry point of a worker process. The worker ID must be in the environment before the
+    Gradio app (and with it `config`) is imported.
+    """
+    os.environ['GHOST_WORKER_ID'] = str(worker_id)
+    from infrastructure.services import gradio_ui
+
+    logging.basicConfig(level=logging.INFO, format=f'[worker {worker_id}] [%(levelname)s] %(message)s')
+    asyncio.run(gradio_ui.main_async(server_port=port))
+
+
+class StickyRouter:
+    """
+    Chooses the worker for a request: by cookie, then by Gradio session hash, then round-robin.
+    """
+
+    def __init__(self, ports):
+        self.ports = ports
+        self._round_robin = itertools.cycle(range(len(ports)))
+
+    def pick(self, request: Request, body: bytes):
+        """
+        Returns (worker index, whether the client still needs a routing cookie).
+        """
+        cookie = request.cookies.get(WORKER_COOKIE, '')
+        if cookie.isdigit() and int(cookie) < len(self.ports):
+            return int(cookie), False
+        session_hash = request.query_params.get('session_hash') or self._session_from_body(body)
+        if session_hash:
+            return zlib.crc32(session_hash.encode('utf-8')) % len(self.ports), False
+        return next(self._round_robin), True
+
+    @staticmethod
+    def _session_from_body(body: bytes):
+        if not body.startswith(b'{'):
+            return None
+        try:
+            return json.loads(body).get('session_hash')
+        except ValueError:
+            return None
+
+
+def create_router_app(ports) -> FastAPI:
+    router = StickyRouter(ports)
+    client = httpx.AsyncClient(timeout=None)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await client.aclose()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.api_route('/{path:path}', methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'HEAD'])
+    async def proxy(request: Request, path: str):
+        body = await request.body()
+        worker, assign_cookie = router.pick(request, body)
+        upstream = client.build_request(
+            request.method,
+            httpx.URL(f"http://127.0.0.1:{ports[worker]}{request.url.path}", query=request.url.query.encode('utf-8')),
+            headers=[(k, v) for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS],
+            content=body,
+        )
+        try:
+            upstream_response = await client.send(upstream, stream=True)
+        except httpx.ConnectError:
+            logging.warning(f"Worker {worker} on port {ports[worker]} is unreachable.")
+            return PlainTextResponse(f"Worker {worker} is unavailable.", status_code=502)
+        response = StreamingResponse(
+            upstream_response.aiter_raw(),
+            status_code=upstream_response.status_code,
+            headers={k: v for k, v in upstream_response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+            background=BackgroundTask(upstream_response.aclose),
+        )
+        if assign_cookie:
+            response.set_cookie(WORKER_COOKIE, str(worker), httponly=True, samesite='lax')
+        return response
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Gradio UI across several worker processes.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7860, help="Front-end port. Workers use the following ports.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[router] [%(levelname)s] %(message)s')
+    ports = [args.port + 1 + i for i in range(args.workers)]
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=run_worker, args=(i, port), daemon=True) for i, port in enumerate(ports)]
+    for worker in workers:
+        worker.start()
+    logging.info(f"Started {len(workers)} workers on ports {ports}.")
+    try:
+        uvicorn.run(create_router_app(ports), host=args.host, port=args.port)
+    finally:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
 import os
+import asyncio
+import contextlib
 from infrastructure.services.llm_api.llm_tools_config import tools
 import logging
 from openai import OpenAI
@@ -6,48 +8,107 @@ from typing import List, Dict
 from dotenv import load_dotenv
 from dataclasses import dataclass, field
 
+from config import (LLM_BACKEND, LLM_CALL_TIMEOUT, LLM_STREAM_DEADLINE, LLM_SUMMARY_DEADLINE, LLM_MAX_RETRIES,
+                    LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY, LLM_HEDGE_DELAY, LLM_BREAKER_THRESHOLD,
+                    LLM_BREAKER_RESET_SECONDS)
 from infrastructure.models.message import Content, Message, ToolCall, ToolFunction
+from infrastructure.services.llm_api.mock_client import MockOpenAI
+from infrastructure.services.llm_api.resilience import Deadline, CircuitBreaker, CircuitOpenError, retry, hedge
 
 
 # Load environment variables
 load_dotenv()
 
 
+def _create_client():
+    if LLM_BACKEND == 'mock':
+        logging.info("Using the offline mock LLM backend.")
+        return MockOpenAI()
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
 @dataclass
 class LLMService:
 
     model: str = os.getenv("GPT_MODEL")
-    client: OpenAI = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client: OpenAI = _create_client()
+    breaker: CircuitBreaker = CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET_SECONDS)
     last_response: any = field(kw_only=True, default=None)
 
+    @staticmethod
+    def _create(messages: List[Dict[str, str]], stream: bool, timeout: float):
+        # Blocking client call, run in a worker thread so deadlines can be enforced from the event loop
+        return LLMService.client.chat.completions.create(
+            model=LLMService.model,
+            messages=messages,
+            stream=stream,
+            tools=tools,
+            timeout=timeout
+        )
+
+    @staticmethod
+    async def complete(messages: List[Dict[str, str]], hedged: bool = False, deadline: Deadline = None) -> str:
+        """
+        Non-streaming completion for idempotent calls such as summarization. Each attempt is
+        bounded by `LLM_CALL_TIMEOUT`, failed attempts are retried with jittered backoff and, if
+        `hedged`, a slow attempt is raced against a second copy. Raises once the deadline or
+        the retries are exhausted, and immediately while the circuit breaker is open.
+        """
+        deadline = deadline or Deadline(LLM_SUMMARY_DEADLINE)
+
+        async def attempt():
+            LLMService.breaker.check()
+            try:
+                response = await deadline.run(
+                    asyncio.to_thread(LLMService._create, messages, False, min(LLM_CALL_TIMEOUT, deadline.remaining())),
+                    cap=LLM_CALL_TIMEOUT
+                )
+            except Exception:
+                LLMService.breaker.record_failure()
+                raise
+            LLMService.breaker.record_success()
+            return response.choices[0].message.content
+
+        call = (lambda: hedge(attempt, LLM_HEDGE_DELAY)) if hedged else attempt
+        return await retry(call, attempts=LLM_MAX_RETRIES, base_delay=LLM_RETRY_BASE_DELAY,
+                           max_delay=LLM_RETRY_MAX_DELAY, deadline=deadline, give_up_on=(CircuitOpenError,))
+
     @staticmethod
     async def send_completion(messages: List[Dict[str, str]], stream: bool = False):
+        response = None
         try:
             logging.info("Preparing to send completion request to LLM.")
             logging.debug("Model: %s, Streaming: %s", LLMService.model, stream)
             logging.debug("Messages: %s", messages)
             logging.info(f"Sending request {'in streaming mode.' if stream else '.'}")
-            response = LLMService.client.chat.completions.create(
-                model=LLMService.model,
-                messages=messages,
-                stream=stream,
-                tools=tools
-            )
             if stream:
-                resp_content = Content(type='text', text='')
-                resp_toolcall = ToolCall(id='', type='function')
-                resp_function = ToolFunction(name='',arguments='')
-                for chunk in response:
-                    delta = chunk.choices[0].delta
-                    if delta.content:
-                        logging.debug("Received stream chunk: %s", delta.content)
-                        resp_content.text += delta.content
-                        yield {'chunk':delta.content,'message':None}
-                    if delta.tool_calls:
-                        logging.debug("Received stream chunk: %s", delta.content)
-                        resp_toolcall.id += delta.tool_calls[0].id if delta.tool_calls[0].id else ""
-                        resp_function.name += delta.tool_calls[0].function.name if delta.tool_calls[0].function.name else ""
-                        resp_function.arguments += delta.tool_calls[0].function.arguments if delta.tool_calls[0].function.arguments else ""
+                # Streamed turns are not retried: a partial answer may already be on screen
+                LLMService.breaker.check()
+                deadline = Deadline(LLM_STREAM_DEADLINE)
+                try:
+                    response = await deadline.run(
+                        asyncio.to_thread(LLMService._create, messages, True, LLM_CALL_TIMEOUT),
+                        cap=LLM_CALL_TIMEOUT
+                    )
+                    chunks = iter(response)
+                    resp_content = Content(type='text', text='')
+                    resp_toolcall = ToolCall(id='', type='function')
+                    resp_function = ToolFunction(name='',arguments='')
+                    while (chunk := await deadline.run(asyncio.to_thread(next, chunks, None), cap=LLM_CALL_TIMEOUT)) is not None:
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            logging.debug("Received stream chunk: %s", delta.content)
+                            resp_content.text += delta.content
+                            yield {'chunk':delta.content,'message':None}
+                        if delta.tool_calls:
+                            logging.debug("Received stream chunk: %s", delta.content)
+                            resp_toolcall.id += delta.tool_calls[0].id if delta.tool_calls[0].id else ""
+                            resp_function.name += delta.tool_calls[0].function.name if delta.tool_calls[0].function.name else ""
+                            resp_function.arguments += delta.tool_calls[0].function.arguments if delta.tool_calls[0].function.arguments else ""
+                except Exception:
+                    LLMService.breaker.record_failure()
+                    raise
+                LLMService.breaker.record_success()
                 if resp_toolcall.id != '':
                     resp_toolcall.function = resp_function
                     LLMService.last_response = Message(role='assistant', tool_calls=[resp_toolcall], tool_call_id=resp_toolcall.id)
@@ -59,7 +120,7 @@ class LLMService:
 
 
             else:
-                content = response.choices[0].message.content
+                content = await LLMService.complete(messages)
                 logging.debug("Received response: %s", content)
                 yield content
 
@@ -67,3 +128,8 @@ class LLMService:
         except Exception as e:
             logging.error("Error in send_completion: %s", e, exc_info=True)
             yield {'flag': 'error', 'content': f"Error: Unable to process the request. Details: {str(e)}"}
+        finally:
+            if hasattr(response, 'close'):
+                # A timed-out read may still hold the stream in its worker thread
+                with contextlib.suppress(Exception):
+                    response.close()
@@ -0,0 +1,66 @@
+"""
+mock_client.py
+==============
+Offline stand-in for the OpenAI client, selected with `LLM_BACKEND=mock`.
+
+`MockOpenAI` exposes the small part of the client surface `LLMService` uses,
+`client.chat.completions.create(...)`, and answers with deterministic text so the app, the
+resilience layer and the benchmark scripts can run without network access or an API key.
+
+Latency and failures can be injected to exercise timeouts, retries and the circuit breaker:
+
+- `MOCK_LLM_LATENCY`: seconds before the first token / the full response (default 0).
+- `MOCK_LLM_TOKEN_DELAY`: seconds between streamed tokens (default 0).
+- `MOCK_LLM_FAILURE_RATE`: probability in [0, 1] that a request raises (default 0).
+"""
+
+import os
+import random
+import time
+from types import SimpleNamespace
+from typing import List, Dict
+
+
+class MockLLMError(RuntimeError):
+    """Raised by the mock backend when a failure is injected."""
+
+
+class MockOpenAI:
+    def __init__(self, latency: float = None, token_delay: float = None, failure_rate: float = None, seed: int = None):
+        self.latency = float(os.getenv("MOCK_LLM_LATENCY", 0)) if latency is None else latency
+        self.token_delay = float(os.getenv("MOCK_LLM_TOKEN_DELAY", 0)) if token_delay is None else token_delay
+        self.failure_rate = float(os.getenv("MOCK_LLM_FAILURE_RATE", 0)) if failure_rate is None else failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    @staticmethod
+    def reply_for(messages: List[Dict]) -> str:
+        """
+        Builds the deterministic reply for a request from its last message.
+        """
+        last = messages[-1] if messages else {}
+        content = last.get('content') or ''
+        if isinstance(content, list):
+            content = " ".join(item.get('text', '') for item in content if isinstance(item, dict))
+        words = str(content).split()
+        return f"Mock reply to a {last.get('role', 'user')} message of {len(words)} words. You said: {' '.join(words[:40])}"
+
+    def create(self, model=None, messages=None, stream=False, tools=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            raise MockLLMError("Injected mock LLM failure")
+        reply = self.reply_for(messages or [])
+        if not stream:
+            message = SimpleNamespace(content=reply, tool_calls=None)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return self._stream(reply)
+
+    def _stream(self, reply: str):
+        for i, word in enumerate(reply.split(" ")):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            delta = SimpleNamespace(content=word if i == 0 else f" {word}", tool_calls=None)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
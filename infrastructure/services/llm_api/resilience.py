@@ -0,0 +1,127 @@
+"""
+resilience.py
+=============
+Building blocks for calling an unreliable upstream LLM.
+
+- `Deadline`: a request-level time budget shared by every attempt of one request.
+- `retry`: jittered exponential backoff for idempotent calls.
+- `hedge`: starts a second copy of a slow call and keeps whichever answers first.
+- `CircuitBreaker`: fails fast after repeated failures, then lets a probe through
+  once `reset_timeout` has passed.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, TypeVar, Tuple, Type
+
+T = TypeVar('T')
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request runs out of its time budget."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the upstream while the circuit breaker is open."""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    async def run(self, awaitable: Awaitable[T], cap: float = None) -> T:
+        """
+        Awaits `awaitable` within the remaining budget (and at most `cap` seconds).
+        """
+        budget = self.remaining() if cap is None else min(cap, self.remaining())
+        try:
+            return await asyncio.wait_for(awaitable, budget)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"No response within {budget:.1f}s") from None
+
+
+async def retry(call: Callable[[], Awaitable[T]], attempts: int, base_delay: float, max_delay: float,
+                deadline: Deadline = None, give_up_on: Tuple[Type[BaseException], ...] = ()) -> T:
+    """
+    Calls `call` up to `attempts` times, sleeping a random ("full jitter") delay of up to
+    base_delay * 2**attempt between tries. Stops early on `give_up_on` errors or when the
+    next sleep would not fit in the deadline.
+    """
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except give_up_on:
+            raise
+        except Exception as e:
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if attempt == attempts - 1 or (deadline and deadline.remaining() <= delay):
+                raise
+            logging.warning(f"Attempt {attempt + 1}/{attempts} failed ({e!r}). Retrying in {delay:.2f}s.")
+            await asyncio.sleep(delay)
+
+
+async def hedge(call: Callable[[], Awaitable[T]], delay: float, copies: int = 2) -> T:
+    """
+    Starts `call`, and starts another copy whenever `delay` seconds pass without an answer or a
+    copy fails, up to `copies` in flight in total. Returns the first successful result and
+    cancels the rest; raises the last error if every copy fails.
+    """
+    pending = {asyncio.create_task(call())}
+    started, error = 1, None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=delay if started < copies else None,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if started < copies:
+                logging.info("Sending hedged request.")
+                pending.add(asyncio.create_task(call()))
+                started += 1
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return 'open'
+        return 'half_open'
+
+    def check(self):
+        """
+        Raises CircuitOpenError while the circuit is open.
+        """
+        if self.state == 'open':
+            raise CircuitOpenError(f"LLM circuit open after {self.failures} consecutive failures")
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logging.info("LLM circuit closed.")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                logging.warning(f"LLM circuit opened after {self.failures} consecutive failures.")
+            self.opened_at = time.monotonic()
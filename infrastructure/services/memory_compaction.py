@@ -0,0 +1,109 @@
+import logging
+import os
+import time
+from filelock import Timeout
+from itertools import groupby
+from typing import List, Dict, Any, Callable, Awaitable, Optional
+from config import COMPACTION_AGE_DAYS, DIGEST_ROLLUP_AGE_DAYS, DEFAULT_DIGEST_PROMPT
+from infrastructure.models import Digest
+from infrastructure.repositories.memory_archive import MemoryArchive
+from infrastructure.repositories.memory_manager import MemoryManager
+from infrastructure.repositories.storage import locked
+
+SECONDS_PER_DAY = 86400
+PERIOD_FORMATS = {'week': '%G-W%V', 'month': '%Y-%m'}
+
+
+def period_key(entry_date: float, period_type: str) -> str:
+    """
+    Returns the calendar period (ISO week or month) a timestamp falls in.
+    """
+    return time.strftime(PERIOD_FORMATS[period_type], time.localtime(entry_date))
+
+
+class MemoryCompactor:
+    """
+    Keeps the hot memory store bounded by moving old memories into the cold archive.
+
+    Conversations older than `COMPACTION_AGE_DAYS` are archived with their transcripts and
+    replaced by one weekly Digest per ISO week. Weekly digests older than
+    `DIGEST_ROLLUP_AGE_DAYS` are archived in turn and replaced by monthly digests, so the
+    number of hot memories grows with the number of months in use rather than with the
+    number of conversations.
+    """
+
+    def __init__(self, mem_manager: MemoryManager, summarize: Callable[..., Awaitable[Any]],
+                 archive: Optional[MemoryArchive] = None):
+        self.mem_manager = mem_manager
+        self.summarize = summarize
+        self.archive = archive if archive is not None else MemoryArchive()
+
+    async def compact(self, now: Optional[float] = None) -> List[Digest]:
+        """
+        Runs both compaction tiers and returns the digests that were written.
+        Only one process compacts at a time; the others skip and pick up the result on their next reload.
+        """
+        os.makedirs(self.archive.archive_dir, exist_ok=True)
+        compaction_lock = locked(self.archive.data_path)
+        try:
+            compaction_lock.acquire(timeout=0)
+        except Timeout:
+            logging.info("Memory compaction already running in another process. Skipping.")
+            return []
+        try:
+            return await self._compact(now or time.time())
+        finally:
+            compaction_lock.release()
+
+    async def _compact(self, now: float) -> List[Digest]:
+        digests = []
+        self.mem_manager.reload_if_changed()
+        stale_conversations = self.mem_manager.get_memories_before(
+            'Conversation', now - COMPACTION_AGE_DAYS * SECONDS_PER_DAY)
+        digests += await self._roll_up(stale_conversations, 'week')
+
+        stale_weeklies = [
+            mem for mem in self.mem_manager.get_memories_before('Digest', now - DIGEST_ROLLUP_AGE_DAYS * SECONDS_PER_DAY)
+            if mem.get('periodType') == 'week'
+        ]
+        digests += await self._roll_up(stale_weeklies, 'month')
+        logging.info(f"Memory compaction complete. {len(digests)} digests written.")
+        return digests
+
+    async def _roll_up(self, memories: List[Dict[str, Any]], period_type: str) -> List[Digest]:
+        digests = []
+        by_period = lambda mem: period_key(mem['entryDate'], period_type)
+        for period, group in groupby(sorted(memories, key=by_period), key=by_period):
+            digest = await self._build_digest(list(group), period, period_type)
+            if digest:
+                digests.append(digest)
+        return digests
+
+    async def _build_digest(self, group: List[Dict[str, Any]], period: str, period_type: str) -> Optional[Digest]:
+        # Fold an existing digest for the same period back in so a period is never split
+        existing = [
+            mem for mem in self.mem_manager.memories
+            if mem['mem_type'] == 'Digest' and mem.get('period') == period and mem.get('periodType') == period_type
+        ]
+        sources = sorted(existing + group, key=lambda mem: mem['entryDate'])
+        content = "\n".join(f"{mem.get('dateString', mem['entryDate'])}: {mem.get('summary', '')}" for mem in sources)
+        summary = await self.summarize(prompt=DEFAULT_DIGEST_PROMPT, content=content)
+        if not isinstance(summary, str) or not summary.strip():
+            logging.warning(f"Unable to summarize {period_type} {period}. Leaving {len(group)} memories in the hot store.")
+            return None
+
+        self.archive.archive(sources)
+        last_entry = sources[-1]['entryDate']
+        source_ids = [m_id for mem in existing for m_id in mem.get('sourceIDs', [])] + [mem['ID'] for mem in group]
+        digest = Digest(
+            period=period,
+            periodType=period_type,
+            summary=summary,
+            sourceIDs=source_ids,
+            entryDate=last_entry,
+            dateString=time.strftime('%a, %d %b %Y %I:%M:%S %p CST', time.localtime(last_entry)),
+        )
+        self.mem_manager.add_memory(digest)
+        self.mem_manager.remove_memories(mem['ID'] for mem in sources)
+        logging.info(f"Rolled {len(group)} memories into {period_type} digest {period}.")
+        return digest
@@ -0,0 +1,118 @@
+"""
+output_stream.py
+================
+Streaming layer between `Coordinator.user_to_completion` and the user interfaces.
+
+`OutputStream` wraps the token stream of one response and:
+
+- Coalesces tokens into one emission per `window` seconds or per `max_bytes` bytes,
+  whichever comes first, instead of one emission per token.
+- Emits either deltas (`mode='delta'`, for front ends that append, like the console) or the
+  accumulated text (`mode='full'`, for front ends that re-render, like `gr.ChatInterface`).
+- Applies backpressure: tokens travel through a bounded queue, so when the client stops
+  consuming, the producer stops pulling from the LLM once `max_pending` tokens are waiting.
+  Whatever piled up is sent as one larger emission when the client catches up.
+- Counts bytes and emissions per session in `SESSION_METRICS`.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Literal
+
+from config import STREAM_WINDOW_SECONDS, STREAM_MAX_BYTES, STREAM_MAX_PENDING
+
+_END = object()
+
+
+@dataclass
+class StreamMetrics:
+    """
+    Running totals for one UI session.
+
+    Attributes:
+        bytes_sent (int): UTF-8 bytes handed to the front end.
+        emissions (int): Number of coalesced emissions handed to the front end.
+        tokens_received (int): Number of non-empty tokens received from the coordinator.
+        backpressure_waits (int): Times the producer had to wait for a slow client.
+    """
+    bytes_sent: int = 0
+    emissions: int = 0
+    tokens_received: int = 0
+    backpressure_waits: int = 0
+
+
+SESSION_METRICS: Dict[str, StreamMetrics] = defaultdict(StreamMetrics)
+
+
+class OutputStream:
+    """
+    Async iterator over the coalesced output of one streamed response.
+    """
+
+    def __init__(self, source: AsyncIterator[str], session_id: str = 'default',
+                 mode: Literal['delta', 'full'] = 'delta', window: float = STREAM_WINDOW_SECONDS,
+                 max_bytes: int = STREAM_MAX_BYTES, max_pending: int = STREAM_MAX_PENDING):
+        self.source = source
+        self.mode = mode
+        self.window = window
+        self.max_bytes = max_bytes
+        self.metrics = SESSION_METRICS[session_id]
+        self.text = ''
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    async def _produce(self):
+        try:
+            async for token in self.source:
+                if not token:
+                    continue
+                self.metrics.tokens_received += 1
+                if self._queue.full():
+                    self.metrics.backpressure_waits += 1
+                await self._queue.put(token)
+        except Exception as e:
+            await self._queue.put(e)
+        else:
+            await self._queue.put(_END)
+
+    def _emit(self, pending: list) -> str:
+        delta = ''.join(pending)
+        pending.clear()
+        self.text += delta
+        payload = delta if self.mode == 'delta' else self.text
+        self.metrics.bytes_sent += len(payload.encode('utf-8'))
+        self.metrics.emissions += 1
+        return payload
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        producer = asyncio.create_task(self._produce())
+        pending, pending_bytes, deadline = [], 0, None
+        finished = False
+        try:
+            while not finished:
+                try:
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    items = [await asyncio.wait_for(self._queue.get(), timeout)]
+                except asyncio.TimeoutError:
+                    items = []
+                # Drain everything that queued up while the client was busy
+                while not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                for item in items:
+                    if item is _END:
+                        finished = True
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        if deadline is None:
+                            deadline = loop.time() + self.window
+                        pending.append(item)
+                        pending_bytes += len(item.encode('utf-8'))
+                if pending and (finished or pending_bytes >= self.max_bytes or loop.time() >= deadline):
+                    yield self._emit(pending)
+                    pending_bytes, deadline = 0, None
+        finally:
+            producer.cancel()
+            logging.debug(f"Stream finished: {len(self.text)} chars, {self.metrics}")
@@ -6,14 +6,20 @@ from infrastructure.services.agent_functions.agentic_memory_management import fu
 from infrastructure.models import Conversation
 from infrastructure.repositories.chat_manager import ChatManager
 from infrastructure.repositories.memory_manager import MemoryManager
+from infrastructure.repositories.recap_cache import RecapCache
 from infrastructure.services.llm_api.llm_api import LLMService
-from config import DEFAULT_MEM_PROMPT, INITIAL_PROMPT, DEFAULT_CONVO_SUM_PROMPT
+from infrastructure.services.memory_compaction import MemoryCompactor
+from infrastructure.services.turn_prefetch import TurnPrefetcher, TURN_METRICS
+from config import DEFAULT_MEM_PROMPT, INITIAL_PROMPT, DEFAULT_CONVO_SUM_PROMPT, DEFAULT_CONVO_MERGE_PROMPT, CHAT_SUMMARY_CHUNK_CHARS
 
 class Coordinator:
     def __init__(self):
         self.llm_service = LLMService()
         self.chat_manager = ChatManager()
         self.mem_manager = MemoryManager()
+        self.memory_compactor = MemoryCompactor(self.mem_manager, self._summarize_memories)
+        self.recap_cache = RecapCache()
+        self.prefetcher = TurnPrefetcher(self.mem_manager)
         self.last_activity_time = time.time()
         self.activity_lock = asyncio.Lock()
         self.cur_user =""
@@ -22,7 +28,7 @@ class Coordinator:
 
     async def set_user(self,name:str=None):
         self.cur_user=name
-        self.chat_manager.add_message(role='system',content=f"Current User: {self.cur_user}")
+        await self.chat_manager.aadd_message(role='system',content=f"Current User: {self.cur_user}")
 
     async def update_last_activity(self):
         """Update the last activity timestamp in a thread-safe manner."""
@@ -44,26 +50,43 @@ class Coordinator:
                 await self.update_last_activity()
             await asyncio.sleep(15)
 
-    async def _summarize_memories(self, prompt: str = DEFAULT_MEM_PROMPT, content: str = ""):
+    async def _summarize_memories(self, prompt: str = DEFAULT_MEM_PROMPT, content: str = "", hedged: bool = False):
+        """Summarize content with retries (and hedging if requested). Returns None if the LLM is unavailable."""
         if content.strip() == "":
             content = str(await self.mem_manager.get_all_memories())
         messages = [
             {"role": "system", "content": prompt},
             {"role": "user", "content": content}
         ]
-        async for response in self.llm_service.send_completion(messages=messages, stream=False):
-            return response
+        try:
+            return await self.llm_service.complete(messages=messages, hedged=hedged)
+        except Exception as e:
+            logging.error(f"Summarization failed: {e!r}")
+            return None
+
+    async def _get_recap(self):
+        """Return the memory recap, reusing one built by any process from the same memory file version."""
+        content = str(await self.mem_manager.get_all_memories())
+        with self.recap_cache.lock:
+            recap = self.recap_cache.get(self.mem_manager.version)
+            if recap is None:
+                recap = await self._summarize_memories(content=content, hedged=True)
+                if recap is None:
+                    logging.warning("LLM unavailable. Serving the last cached recap.")
+                    recap = self.recap_cache.get_latest() or ""
+                else:
+                    self.recap_cache.put(self.mem_manager.version, recap)
+        return recap
 
     async def build_system_instructions(self, refresh:bool = False):
         if refresh:
             self.mem_manager.load_memories()
-        recap = await self._summarize_memories()
-        identity = self.mem_manager.get_identity()
-        self.chat_manager.add_message(
+        recap = await self._get_recap()
+        await self.chat_manager.aadd_message(
             role='system',
-            content=f"Your name is {identity['name']} {INITIAL_PROMPT} {recap} {identity}"
+            content=f"Your name is {self.mem_manager.self_person.name} {INITIAL_PROMPT} {recap}\nYour identity:\n{self.mem_manager.get_persona()}"
         )
-        self.chat_manager.add_message(
+        await self.chat_manager.aadd_message(
             role='system',
             content=f"{self.mem_manager.misc_details_collection}"
         )
@@ -71,55 +94,79 @@ class Coordinator:
 
     async def user_to_completion(self, message: str, role: str ='user'):
         """Process a user message and yield the assistant's streamed response."""
+        started = time.perf_counter()
+        # Everything but the new messages was prepared while the user was typing
+        prepared, warm = await self.prefetcher.take(self.chat_manager.transcript)
+        new_messages = []
         if role == 'user':
-            self.chat_manager.add_message(
+            new_messages.append(dict(
                 role='system',
                 content=f"Current time:{time.strftime('%a, %d %b %Y %I:%M:%S %p', time.localtime())} CST Location:Montgomery, TX 77356"
-            )
-        self.chat_manager.add_message(role=role, content=message)
+            ))
+        new_messages.append(dict(role=role, content=message))
+        await self.chat_manager.aadd_messages(new_messages)
         logging.debug("User prompt stored in chat log.")
-        async for chunk in self._stream_completion():
+        first_token = True
+        async for chunk in self._stream_completion(messages=prepared.request(self.chat_manager.transcript[-len(new_messages):])):
+            if first_token and chunk:
+                TURN_METRICS.record(warm, time.perf_counter() - started)
+                first_token = False
             yield chunk
-        if LLMService.last_response.get('tool_call_id'):
+        if LLMService.last_response and LLMService.last_response.get('tool_call_id'):
             async for chunk in self._tool_completion(LLMService.last_response):
                 yield chunk
+        self.prefetcher.schedule(self.chat_manager.transcript)
 
-    async def _stream_completion(self):
+    async def _stream_completion(self, messages=None):
         response = None
-        async for chunk in self.llm_service.send_completion(messages=self.chat_manager.get_transcript(), stream=True):
+        messages = messages if messages is not None else list(self.chat_manager.transcript)
+        async for chunk in self.llm_service.send_completion(messages=messages, stream=True):
+            if chunk.get('flag') == 'error':
+                # Nothing is stored for a failed turn, so the next message is sent against the same transcript
+                LLMService.last_response = None
+                yield f"\n[{chunk['content']}]"
+                return
             response = chunk.get('message')
             yield chunk.get('chunk')
         LLMService.last_response = json.loads(response)
         logging.debug(f"Response ~ {LLMService.last_response}")
-        self.chat_manager.add_response(LLMService.last_response)
+        await self.chat_manager.aadd_response(LLMService.last_response)
         logging.debug("Assistant response stored in chat log.")
 
     async def _tool_completion(self,tool_response):
         tool_resp_msg =await function_router(name=tool_response['tool_calls'][0]['function']['name'],arguments= json.loads(str(tool_response['tool_calls'][0]['function']['arguments'])))
         content = dict(type='text', text=str({"response":f'{tool_resp_msg}'}))
-        self.chat_manager.add_response(dict(role='tool', tool_call_id=tool_response.get('tool_call_id'), content=[content]))
+        await self.chat_manager.aadd_response(dict(role='tool', tool_call_id=tool_response.get('tool_call_id'), content=[content]))
         async for chunk in self._stream_completion():
             yield chunk
 
 
     async def create_conversation(self):
-        self.chat_manager.load_transcript()
-        transcript = str(self.chat_manager.get_transcript(trimmed=True))
-        if transcript != "[]":
-            response = await self._summarize_memories(prompt=DEFAULT_CONVO_SUM_PROMPT, content=transcript)
-            convo = Conversation(transcript=transcript, summary=response)
-            self.mem_manager.add_memory(convo)
-            return convo
-        else:
+        await self.chat_manager.aload_transcript()
+        # Stream the transcript, spilled pages included, into summarization one chunk at a time
+        chunks, summaries = [], []
+        async for chunk in self.chat_manager.atranscript_chunks(CHAT_SUMMARY_CHUNK_CHARS, trimmed=True):
+            chunks.append(chunk)
+            summaries.append(await self._summarize_memories(prompt=DEFAULT_CONVO_SUM_PROMPT, content=chunk))
+        if not chunks:
             return
+        summaries = [summary for summary in summaries if summary]
+        response = summaries[0] if len(summaries) == 1 else None
+        if len(summaries) > 1:
+            parts = "\n\n".join(f"Part {i}: {summary}" for i, summary in enumerate(summaries, 1))
+            response = await self._summarize_memories(prompt=DEFAULT_CONVO_MERGE_PROMPT, content=parts) or parts
+        convo = Conversation(transcript=chunks[0] if len(chunks) == 1 else chunks, summary=response or "")
+        await self.mem_manager.aadd_memory(convo)
+        return convo
 
     async def save_current_start_new(self):
         logging.info('auto save started')
         logging.info("attempting Storing current conversation into memory and starting a new one.")
         conversation = await self.create_conversation()
         if conversation:
-            self.chat_manager.clear_transcript()
+            await self.chat_manager.aclear_transcript()
             await self.build_system_instructions(refresh=True)
+            self.prefetcher.schedule(self.chat_manager.transcript)
             logging.info("save_current_start_new complete")
         else:
             logging.info("no conversation to clear")
@@ -129,12 +176,23 @@ class Coordinator:
         print('Saving', end='', flush=True)
         logging.info("attempting Storing current conversation into memory")
         await self.create_conversation()
+        await self.mem_manager.awrite_snapshot()
         print('\rSession SAVED')
 
 
+    async def compact_memories(self):
+        """Archive old conversations and roll their summaries into period digests."""
+        logging.info("Compacting memories...")
+        digests = await self.memory_compactor.compact()
+        if digests:
+            await self.mem_manager.awrite_snapshot()
+        return digests
+
     async def system_start_up(self):
         logging.info("Running system startup...")
+        await self.compact_memories()
         await self.build_system_instructions()
+        self.prefetcher.schedule(self.chat_manager.transcript)
         logging.info('initial payload complete')
         logging.info("System instructions built.")
 
@@ -0,0 +1,179 @@
+"""
+turn_prefetch.py
+================
+Idle-time preparation of the next chat turn.
+
+After a response finishes streaming, the process is idle until the user types. `TurnPrefetcher`
+uses that time to prepare everything the next request needs except the new messages:
+
+- The stable prefix: the transcript as it will be sent, copied so later appends leave it intact.
+- Candidate memories: the Fact, Event, Digest and Conversation memories sharing the most keywords
+  with the last few messages, rendered into one system message placed after the prefix. The
+  message goes into the request only; it is not stored in the transcript.
+
+`take(transcript)` returns the prepared turn if the transcript has not changed since it was
+prepared (a warm turn). Otherwise, it prepares the turn inline (a cold turn). `TURN_METRICS` records
+time to first token (TTFT) separately for warm and cold turns.
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from config import PREFETCH_CONTEXT_MESSAGES, PREFETCH_MEMORY_LIMIT
+
+CANDIDATE_MEM_TYPES = ('Fact', 'Event', 'Digest', 'Conversation')
+_WORD = re.compile(r"[a-z0-9']{4,}")
+_STOPWORDS = frozenset(
+    "about after again also been before being could does doing from have having here into just "
+    "like more most much only other over same should some such than that their them then there "
+    "these they this those through under very were what when where which while will with would "
+    "your yours you're it's that's what's i'm".split()
+)
+
+
+def keywords(text: str) -> FrozenSet[str]:
+    return frozenset(_WORD.findall(text.lower())) - _STOPWORDS
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    """
+    Returns the plain text of a transcript message, whose content is a string or a list of parts.
+    """
+    content = message.get('content') or ''
+    if isinstance(content, list):
+        return " ".join(part.get('text', '') for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def memory_text(memory: Dict[str, Any]) -> str:
+    return memory.get('note') or memory.get('summary') or ''
+
+
+@dataclass
+class PreparedTurn:
+    """
+    The part of the next request that does not depend on the new messages.
+
+    Attributes:
+        prefix (list): Copy of the transcript messages to send ahead of the new messages.
+        memory_message (dict): System message listing candidate memories, or None if none matched.
+        last_message (dict): The transcript's last message when prepared, to detect changes.
+    """
+    prefix: List[Dict[str, Any]]
+    memory_message: Optional[Dict[str, Any]] = None
+    last_message: Optional[Dict[str, Any]] = None
+
+    def matches(self, transcript: List[Dict[str, Any]]) -> bool:
+        return len(transcript) == len(self.prefix) and (not transcript or transcript[-1] is self.last_message)
+
+    def request(self, new_messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the messages to send: prefix, candidate memories, then the new messages.
+        """
+        return self.prefix + ([self.memory_message] if self.memory_message else []) + list(new_messages)
+
+
+@dataclass
+class TurnMetrics:
+    """
+    Time to first token of recent turns.
+
+    Attributes:
+        warm_ttft (deque): TTFT in seconds of turns that used a prefetched context.
+        cold_ttft (deque): TTFT in seconds of turns that had to prepare their context inline.
+    """
+    warm_ttft: deque = field(default_factory=lambda: deque(maxlen=200))
+    cold_ttft: deque = field(default_factory=lambda: deque(maxlen=200))
+
+    def record(self, warm: bool, ttft: float):
+        (self.warm_ttft if warm else self.cold_ttft).append(ttft)
+        logging.info(f"TTFT {ttft * 1000:.1f} ms ({'warm' if warm else 'cold'} turn)")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            kind: dict(turns=len(samples), median_ms=round(statistics.median(samples) * 1000, 2) if samples else None)
+            for kind, samples in (('warm', self.warm_ttft), ('cold', self.cold_ttft))
+        }
+
+
+TURN_METRICS = TurnMetrics()
+
+
+class TurnPrefetcher:
+    def __init__(self, mem_manager, memory_limit: int = PREFETCH_MEMORY_LIMIT,
+                 context_messages: int = PREFETCH_CONTEXT_MESSAGES):
+        self.mem_manager = mem_manager
+        self.memory_limit = memory_limit
+        self.context_messages = context_messages
+        self._keywords: Dict[str, FrozenSet[str]] = {}
+        self._prepared: Optional[PreparedTurn] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def candidate_memories(self, transcript: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns up to `memory_limit` memories ranked by keyword overlap with the recent messages,
+        newest first among ties. Keyword sets are cached per memory ID.
+        """
+        recent = [message_text(message) for message in transcript[-self.context_messages:]
+                  if message.get('role') in ('user', 'assistant')]
+        query = keywords(" ".join(recent))
+        if not query:
+            return []
+        scored = []
+        for memory in self.mem_manager.memories:
+            if memory['mem_type'] not in CANDIDATE_MEM_TYPES:
+                continue
+            terms = self._keywords.get(memory['ID'])
+            if terms is None:
+                terms = self._keywords[memory['ID']] = keywords(memory_text(memory))
+            overlap = len(query & terms)
+            if overlap:
+                scored.append((overlap, memory['entryDate'], memory))
+        return [memory for *_, memory in heapq.nlargest(self.memory_limit, scored, key=lambda s: s[:2])]
+
+    def prepare(self, transcript: List[Dict[str, Any]]) -> PreparedTurn:
+        prefix = list(transcript)
+        memories = self.candidate_memories(prefix)
+        memory_message = None
+        if memories:
+            lines = "\n".join(f"- [{mem['mem_type']}, {mem.get('dateString', '')}] {memory_text(mem)}" for mem in memories)
+            memory_message = dict(role='system', content=f"Memories that may be relevant to this conversation:\n{lines}")
+        return PreparedTurn(prefix=prefix, memory_message=memory_message, last_message=prefix[-1] if prefix else None)
+
+    async def _prefetch(self, transcript: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        try:
+            # The memory scan is CPU bound; a worker thread keeps the loop free for other sessions
+            self._prepared = await asyncio.to_thread(self.prepare, transcript)
+            logging.debug(f"Next turn prefetched in {(time.perf_counter() - started) * 1000:.1f} ms.")
+        except Exception as e:
+            logging.warning(f"Prefetching the next turn failed: {e!r}")
+
+    def schedule(self, transcript: List[Dict[str, Any]]):
+        """
+        Starts preparing the next turn in the background, replacing any earlier preparation.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._prepared = None
+        self._task = asyncio.create_task(self._prefetch(list(transcript)))
+
+    async def take(self, transcript: List[Dict[str, Any]]) -> tuple:
+        """
+        Returns (prepared turn, warm). Waits for a prefetch still in flight, since it is the same
+        work a cold turn would do, and prepares inline if nothing usable was prefetched.
+        """
+        if self._task is not None:
+            await asyncio.wait({self._task})
+            self._task = None
+        prepared, self._prepared = self._prepared, None
+        if prepared is not None and prepared.matches(transcript):
+            return prepared, True
+        return await asyncio.to_thread(self.prepare, transcript), False
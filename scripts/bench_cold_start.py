@@ -0,0 +1,94 @@
+"""
+Compares MemoryManager cold start from memories.json against the memory-mapped snapshot.
+
+For every store size the script writes a synthetic memories.json (one self Person plus a mix of
+Conversations with transcripts, Facts and Events) to a temporary directory, then times:
+
+- json: the JSON loader as it ran before snapshots (parse, ID set, self Person scan).
+- snapshot: `MemoryManager` opening the snapshot with an empty journal.
+- snapshot+tail: the same with `--tail` memories added through the journal since the snapshot.
+
+Example Usage:
+```
+python scripts/bench_cold_start.py --sizes 10000 100000
+```
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infrastructure.models import Person, Fact, Event, Conversation
+from infrastructure.repositories.memory_manager import MemoryManager
+
+
+def synthetic_memories(count: int):
+    memories = [Person(name="Bench", relation="self", isSelf=True, alive=True).__dict__]
+    for i in range(count - 1):
+        if i % 3 == 0:
+            memory = Conversation(transcript=f"[{{'role': 'user', 'content': 'message {i}'}}]" * 20, summary=f"Summary {i}")
+        elif i % 3 == 1:
+            memory = Fact(source="bench", note=f"Fact number {i}")
+        else:
+            memory = Event(note=f"Event number {i}", dates=[time.time()])
+        memories.append(memory.__dict__)
+    return memories
+
+
+def legacy_load(file_path: str):
+    with open(file_path, 'r') as file:
+        memories = json.load(file)["memories"]
+    memory_ids = {mem["ID"] for mem in memories}
+    self_person = next((Person(**mem) for mem in memories if mem.get("mem_type") == "Person" and mem.get("isSelf")), None)
+    return memories, memory_ids, self_person
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench(size: int, tail: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'memories.json')
+        with open(file_path, 'w') as file:
+            json.dump({"memories": synthetic_memories(size)}, file, indent=4)
+
+        json_seconds = timed(lambda: legacy_load(file_path), repeat)
+        MemoryManager(file_path)  # first load writes the snapshot
+        snapshot_seconds = timed(lambda: MemoryManager(file_path), repeat)
+
+        manager = MemoryManager(file_path)
+        for i in range(tail):
+            manager.add_memory(Fact(source="bench", note=f"Tail fact {i}"))
+        tail_seconds = timed(lambda: MemoryManager(file_path), repeat)
+        assert len(MemoryManager(file_path).memories) == size + tail
+    return json_seconds, snapshot_seconds, tail_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--tail', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'memories':>9} {'json ms':>9} {'snapshot ms':>12} {'+tail ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        json_seconds, snapshot_seconds, tail_seconds = bench(size, args.tail, args.repeat)
+        print(f"{size:>9} {json_seconds * 1000:>9.1f} {snapshot_seconds * 1000:>12.2f} "
+              f"{tail_seconds * 1000:>9.2f} {json_seconds / snapshot_seconds:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
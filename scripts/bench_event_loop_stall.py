@@ -0,0 +1,117 @@
+"""
+Measures how long chat persistence stalls the event loop during a simulated turn.
+
+A heartbeat coroutine sleeps `--tick` seconds in a loop and records how late it wakes up. While
+it runs, a turn is simulated against a transcript of `--messages` messages: a system message, the
+user message and the assistant response are each appended and the whole transcript is saved, then
+the transcript is reloaded. This is done twice:
+
+- sync: the blocking json-module read/write (4-space indent) the app used before, called on the loop.
+- async: `ChatManager`'s async methods (aiofiles + orjson). Messages beyond `CHAT_WINDOW_MESSAGES`
+  are spilled to disk, so each save rewrites only the recent window.
+
+The report lists the worst and the total heartbeat lag per turn; the worst lag is the longest
+time a concurrent session (e.g. another Gradio user's stream) would have frozen.
+
+Example Usage:
+```
+python scripts/bench_event_loop_stall.py --messages 2000 5000 --turns 10
+```
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infrastructure.repositories.chat_manager import ChatManager
+
+
+def synthetic_transcript(count: int):
+    return [{"role": "user" if i % 2 else "assistant",
+             "content": f"Message {i} " + "lorem ipsum dolor sit amet " * 20,
+             "timestamp": time.time()} for i in range(count)]
+
+
+class Heartbeat:
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.lags = []
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(self.tick)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.tick))
+
+
+def sync_save(path, transcript):
+    with open(path, 'w') as file:
+        json.dump(transcript, file, indent=4)
+
+
+def sync_load(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+async def sync_turn(path, transcript):
+    for role in ('system', 'user', 'assistant'):
+        transcript.append({"role": role, "content": "turn message", "timestamp": time.time()})
+        sync_save(path, transcript)
+        await asyncio.sleep(0)
+    return sync_load(path)
+
+
+async def async_turn(chat_manager: ChatManager):
+    for role in ('system', 'user', 'assistant'):
+        await chat_manager.aadd_message(role, "turn message")
+    await chat_manager.aload_transcript()
+    return chat_manager.transcript
+
+
+async def measure(turn, turns: int, tick: float):
+    worst, total = [], []
+    for _ in range(turns):
+        heartbeat, stop = Heartbeat(tick), asyncio.Event()
+        beat = asyncio.create_task(heartbeat.run(stop))
+        await asyncio.sleep(tick * 2)
+        heartbeat.lags.clear()
+        await turn()
+        stop.set()
+        await beat
+        worst.append(max(heartbeat.lags, default=0.0))
+        total.append(sum(heartbeat.lags))
+    return statistics.median(worst) * 1000, statistics.median(total) * 1000
+
+
+async def main(sizes, turns: int, tick: float):
+    print(f"{'messages':>9} {'mode':>6} {'worst lag ms':>13} {'total lag ms':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            sync_path = os.path.join(tmp, f"sync-{size}.json")
+            transcript = synthetic_transcript(size)
+            sync_save(sync_path, transcript)
+            worst, total = await measure(lambda: sync_turn(sync_path, transcript), turns, tick)
+            print(f"{size:>9} {'sync':>6} {worst:>13.2f} {total:>13.2f}")
+
+            chat_manager = ChatManager(file_path=os.path.join(tmp, f"async-{size}.json"))
+            chat_manager.transcript.replace(synthetic_transcript(size))
+            await chat_manager.asave_transcript()
+            worst, total = await measure(lambda: async_turn(chat_manager), turns, tick)
+            print(f"{size:>9} {'async':>6} {worst:>13.2f} {total:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark event-loop stalls caused by chat persistence.")
+    parser.add_argument("--messages", type=int, nargs="+", default=[500, 2000, 5000], help="Transcript sizes")
+    parser.add_argument("--turns", type=int, default=10, help="Simulated turns per size")
+    parser.add_argument("--tick", type=float, default=0.001, help="Heartbeat interval in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.turns, args.tick))
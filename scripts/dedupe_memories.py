@@ -0,0 +1,22 @@
+"""
+Merges near-duplicate entries already stored in remember.json and near-duplicate Fact/Event
+memories in memories.json. New remember items are deduplicated as they are recorded.
+
+Example Usage:
+```
+python scripts/dedupe_memories.py
+```
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infrastructure.repositories.memory_manager import MemoryManager
+from infrastructure.services.agent_functions.agentic_memory_management import dedupe_remember_list
+from infrastructure.services.dedup import dedupe_memories
+
+if __name__ == '__main__':
+    print(f"remember.json: merged {dedupe_remember_list()} duplicate items")
+    print(f"memories.json: merged {dedupe_memories(MemoryManager())} duplicate memories")
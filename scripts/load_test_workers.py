@@ -0,0 +1,97 @@
+"""
+Measures chat throughput of the multi-process Gradio deployment as the worker count grows.
+
+For every worker count the script starts `infrastructure.services.gradio_workers`, waits for all
+workers to come up, drives `--sessions` concurrent chat sessions of `--turns` messages each
+through the front-end proxy with `gradio_client`, and then shuts the deployment down.
+
+Example Usage:
+```
+python scripts/load_test_workers.py --workers 1 2 4 --sessions 16 --turns 5
+```
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from gradio_client import Client
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_ready(ports, timeout: float):
+    deadline = time.time() + timeout
+    pending = set(ports)
+    while pending and time.time() < deadline:
+        for port in list(pending):
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    pending.discard(port)
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.5)
+    if pending:
+        raise TimeoutError(f"Ports {sorted(pending)} did not come up within {timeout}s")
+
+
+def run_session(url: str, session: int, turns: int):
+    client = Client(url, verbose=False)
+    latencies = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        client.predict(f"Load test session {session}, message {turn}.", api_name='/chat')
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure(workers: int, port: int, sessions: int, turns: int, startup_timeout: float):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'infrastructure.services.gradio_workers', '--workers', str(workers), '--port', str(port)],
+        cwd=ROOT_DIR,
+    )
+    try:
+        wait_until_ready([port] + [port + 1 + i for i in range(workers)], startup_timeout)
+        url = f"http://127.0.0.1:{port}/"
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(lambda s: run_session(url, s, turns), range(sessions)))
+        elapsed = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    latencies = sorted(latency for session in results for latency in session)
+    return {
+        'workers': workers,
+        'turns': len(latencies),
+        'seconds': elapsed,
+        'turns_per_second': len(latencies) / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--sessions', type=int, default=16)
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--port', type=int, default=7960)
+    parser.add_argument('--startup-timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'turns':>6} {'seconds':>8} {'turns/s':>8} {'p50 s':>7} {'p95 s':>7}")
+    for workers in args.workers:
+        row = measure(workers, args.port, args.sessions, args.turns, args.startup_timeout)
+        print(f"{row['workers']:>8} {row['turns']:>6} {row['seconds']:>8.2f} {row['turns_per_second']:>8.2f} "
+              f"{row['p50']:>7.3f} {row['p95']:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
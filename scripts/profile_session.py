@@ -0,0 +1,277 @@
+"""
+Profiles a replayed chat session end to end against the offline mock LLM.
+
+The user messages of a recorded transcript (data/chat.json by default) are replayed, cycling
+until `--turns` turns, through the real front-end entry points:
+
+- console: `apps.console_chat_ui.console_interaction`, with `input()` fed from the replay.
+- gradio: `infrastructure.services.gradio_ui.chat_loop`, called the way `gr.ChatInterface` calls it.
+
+Each UI runs in its own subprocess with `LLM_BACKEND=mock` against a scratch copy of data/
+(`GHOST_DATA_DIR`), so the repository data is never modified. Start-up (compaction, recap) and
+the final save are part of the session. Three profilers run at once:
+
+- cProfile: per-function cumulative and own time of the event-loop thread.
+- tracemalloc: peak traced memory and the allocations (size and block count) still alive at the
+  end of the session, by line and by file.
+- A sampling thread reading `sys._current_frames()` every `--interval` seconds. Its stacks are
+  written as `<ui>.collapsed`, the input format of flamegraph.pl and speedscope, and include
+  worker threads (file I/O, the mock LLM) that cProfile does not see.
+
+Each report (`<ui>.txt`) opens with the tracked areas: transcript saves, `get_all_memories`,
+pydantic model assembly and logging. tracemalloc slows Python code down noticeably, so pass
+`--no-tracemalloc` for cleaner timings. `--baseline` writes the reports as
+`profiles/baseline-<ui>.txt`, which are tracked in git to compare later runs against.
+
+Example Usage:
+```
+python scripts/profile_session.py --turns 50
+python scripts/profile_session.py --ui console --baseline
+```
+"""
+
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from itertools import cycle, islice
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.path.join(ROOT_DIR, 'profiles')
+UIS = ('console', 'gradio')
+# Thread-pool workers blocked on their work queue have this frame on top
+IDLE_WORKER_FILE = os.path.join('concurrent', 'futures', 'thread.py')
+
+sys.path.insert(0, ROOT_DIR)
+
+# (label, functions) - cumulative times of the listed (file suffix, function) pairs are summed,
+# so only list functions that do not call each other
+TRACKED_AREAS = [
+    ('save_transcript', [('chat_manager.py', 'save_transcript'), ('chat_manager.py', 'asave_transcript')]),
+    ('get_all_memories', [('memory_manager.py', 'get_all_memories')]),
+    ('pydantic assembly', [(os.path.join('pydantic', 'main.py'), name) for name in
+                           ('__init__', 'model_dump', 'model_dump_json', 'model_validate', 'model_validate_json')]),
+    ('logging', [(os.path.join('logging', '__init__.py'), '_log')]),
+]
+
+
+def short_path(path: str) -> str:
+    if path.startswith(ROOT_DIR):
+        return os.path.relpath(path, ROOT_DIR)
+    for marker in ('site-packages' + os.sep, 'lib' + os.sep + 'python'):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return path
+
+
+def replay_messages(transcript_path: str, turns: int):
+    with open(transcript_path, 'r') as file:
+        recorded = [message['content'] for message in json.load(file)
+                    if message.get('role') == 'user' and isinstance(message.get('content'), str)]
+    if not recorded:
+        raise SystemExit(f"No user messages to replay in {transcript_path}")
+    return list(islice(cycle(recorded), turns))
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of every other thread at a fixed interval into collapsed-stack counts.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+async def drive_console(messages):
+    from apps import console_chat_ui as console
+    feed = iter(["Profiler", *messages, "-esc"])
+    console.input = lambda prompt='': next(feed)
+    await console.coordinator.system_start_up()
+    await console.get_cur_user()
+    with contextlib.suppress(SystemExit):
+        await console.console_interaction()
+
+
+async def drive_gradio(messages):
+    from infrastructure.services import gradio_ui
+    await gradio_ui.coordinator.system_start_up()
+    request = SimpleNamespace(session_hash='profile')
+    history = []
+    for message in messages:
+        reply = ''
+        async for reply in gradio_ui.chat_loop(message, history, request):
+            pass
+        history += [dict(role='user', content=message), dict(role='assistant', content=reply)]
+    await gradio_ui.coordinator.save_current()
+
+
+def area_times(stats: pstats.Stats):
+    rows = []
+    for label, functions in TRACKED_AREAS:
+        calls = cumulative = 0
+        for (filename, _, name), (_, ncalls, _, ct, _) in stats.stats.items():
+            if any(filename.endswith(suffix) and name == func for suffix, func in functions):
+                calls += ncalls
+                cumulative += ct
+        rows.append((label, calls, cumulative))
+    return rows
+
+
+def write_report(path, ui, turns, wall, profiler, sampler, memory, top):
+    from infrastructure.services.turn_prefetch import TURN_METRICS
+    out = io.StringIO()
+    stats = pstats.Stats(profiler)
+    total = stats.total_tt
+    out.write(f"Session profile: ui={ui} turns={turns} backend=mock python={sys.version.split()[0]}\n")
+    out.write(f"Wall time {wall:.2f} s, profiled time on the event-loop thread {total:.2f} s (includes idle polling)\n")
+    out.write(f"TTFT {TURN_METRICS.summary()}\n\n")
+
+    out.write("Tracked areas (cumulative, event-loop thread)\n")
+    out.write(f"{'area':<20} {'calls':>8} {'seconds':>9} {'share':>7}\n")
+    for label, calls, cumulative in area_times(stats):
+        out.write(f"{label:<20} {calls:>8} {cumulative:>9.3f} {cumulative / total:>7.1%}\n")
+
+    out.write(f"\nTop {top} functions by cumulative time\n")
+    listing = io.StringIO()
+    pstats.Stats(profiler, stream=listing).strip_dirs().sort_stats('cumulative').print_stats(top)
+    out.write(listing.getvalue().split("\n\n", 1)[-1].strip() + "\n")
+
+    if memory is not None:
+        peak, by_line, by_file = memory
+        out.write(f"\nPeak traced memory {peak / 1024 ** 2:.1f} MiB. Allocations alive at the end of the session:\n")
+        for title, statistics in (("by line", by_line), ("by file", by_file)):
+            out.write(f"{title}:\n")
+            for stat in statistics[:top]:
+                frame = stat.traceback[0]
+                location = f"{short_path(frame.filename)}:{frame.lineno}" if title == "by line" else short_path(frame.filename)
+                out.write(f"  {stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {location}\n")
+
+    for title, on_loop in (("event-loop thread", True), ("worker threads", False)):
+        leaves = Counter()
+        for stack, count in sampler.stacks.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            if stack.startswith('MainThread;') == on_loop and not (leaf.startswith('_worker (') and IDLE_WORKER_FILE in leaf):
+                leaves[leaf] += count
+        samples = sum(leaves.values())
+        out.write(f"\nSampled self time, {title} ({samples} samples every {sampler.interval * 1000:.0f} ms,"
+                  f" idle pool workers excluded)\n")
+        for leaf, count in leaves.most_common(top):
+            out.write(f"  {count / samples:>6.1%}  {leaf}\n")
+
+    with open(path, 'w') as file:
+        file.write(out.getvalue())
+    print(out.getvalue())
+
+
+def run_session(args):
+    """
+    Child process: replays the session for one UI and writes its report and collapsed stacks.
+    """
+    messages = replay_messages(args.transcript, args.turns)
+    # Importing the UI module builds its Coordinator; keep that out of the profile
+    driver = drive_console if args.ui == 'console' else drive_gradio
+    if args.ui == 'console':
+        import apps.console_chat_ui  # noqa: F401
+    else:
+        import infrastructure.services.gradio_ui  # noqa: F401
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(args.interval)
+    if args.tracemalloc:
+        tracemalloc.start()
+    sampler.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiler.enable()
+        asyncio.run(driver(messages))
+        profiler.disable()
+    wall = time.perf_counter() - started
+    sampler.stop()
+    memory = None
+    if args.tracemalloc:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        memory = (tracemalloc.get_traced_memory()[1], snapshot.statistics('lineno'), snapshot.statistics('filename'))
+        tracemalloc.stop()
+
+    os.makedirs(args.out, exist_ok=True)
+    name = f"baseline-{args.ui}" if args.baseline else args.ui
+    with open(os.path.join(args.out, f"{args.ui}.collapsed"), 'w') as file:
+        file.writelines(f"{stack} {count}\n" for stack, count in sorted(sampler.stacks.items()))
+    profiler.dump_stats(os.path.join(args.out, f"{args.ui}.prof"))
+    write_report(os.path.join(args.out, f"{name}.txt"), args.ui, len(messages), wall,
+                 profiler, sampler, memory, args.top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a replayed chat session against the mock LLM.")
+    parser.add_argument("--ui", choices=[*UIS, 'both'], default='both', help="Front end to drive")
+    parser.add_argument("--turns", type=int, default=50, help="User turns to replay")
+    parser.add_argument("--transcript", default=os.path.join(ROOT_DIR, 'data', 'chat.json'), help="Recorded chat to replay")
+    parser.add_argument("--interval", type=float, default=0.005, help="Stack sampling interval in seconds")
+    parser.add_argument("--top", type=int, default=25, help="Rows per report section")
+    parser.add_argument("--out", default=PROFILE_DIR, help="Output directory")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false", help="Skip allocation tracing")
+    parser.add_argument("--baseline", action="store_true", help="Write the reports as the tracked baselines")
+    parser.add_argument("--run-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_child:
+        run_session(args)
+        return
+
+    for ui in (UIS if args.ui == 'both' else (args.ui,)):
+        with tempfile.TemporaryDirectory() as scratch:
+            data_dir = os.path.join(scratch, 'data')
+            shutil.copytree(os.path.join(ROOT_DIR, 'data'), data_dir,
+                            ignore=shutil.ignore_patterns('*.lock', '*.tmp', '*.snapshot', '*.journal'))
+            env = dict(os.environ, GHOST_DATA_DIR=data_dir, LLM_BACKEND='mock',
+                       MOCK_LLM_LATENCY='0', MOCK_LLM_TOKEN_DELAY='0', MOCK_LLM_FAILURE_RATE='0')
+            child = [sys.executable, os.path.abspath(__file__), '--run-child', '--ui', ui, '--turns', str(args.turns),
+                     '--transcript', os.path.abspath(args.transcript), '--interval', str(args.interval),
+                     '--top', str(args.top), '--out', os.path.abspath(args.out)]
+            child += ['--baseline'] if args.baseline else []
+            child += [] if args.tracemalloc else ['--no-tracemalloc']
+            subprocess.run(child, env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()